@@ -2,42 +2,8 @@
 
 import sys
 import os
-import asyncio
-import json
-import time
-import logging
-import random
-import aiohttp
-import re
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from aiohttp import web
-from dataclasses import dataclass, field
 
-# Unbuffered output for logging in Railway
-sys.stdout.reconfigure(line_buffering=True)
-sys.stderr.reconfigure(line_buffering=True)
-
-logging.basicConfig(...)
-logger = logging.getLogger('TradingBot')
-
-# Get environment variables safely
-TELEGRAM_API_ID = os.environ.get('TELEGRAM_API_ID', os.environ.get('TG_API_ID', ''))
-TELEGRAM_API_HASH = os.environ.get('TELEGRAM_API_HASH', os.environ.get('TG_API_HASH', ''))
-HELIUS_API_KEY = os.environ.get('HELIUS_API_KEY', '')
-# ... and so on
-
-# Fail if required variables are missing for safety
-if not TELEGRAM_API_ID or not TELEGRAM_API_HASH:
-    logger.error("Missing Telegram API credentials. Please set TELEGRAM_API_ID and TELEGRAM_API_HASH.")
-    sys.exit(1)
-
-# ...rest of your code...
-
-import sys
-import os
-
-# Ensure unbuffered output
+# Ensure unbuffered output for logging in Railway
 sys.stdout.reconfigure(line_buffering=True)
 sys.stderr.reconfigure(line_buffering=True)
 
@@ -45,19 +11,24 @@ sys.stderr.reconfigure(line_buffering=True)
 os.environ['TELETHON_USE_CRYPTG'] = '0'
 os.environ['PYTHONUNBUFFERED'] = '1'
 
-# Add error handling for imports
+import asyncio
+import gzip
+import hashlib
+import importlib.util
+import json
+import time
+import logging
+import re
+import signal
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+# Add error handling for third-party imports
 try:
-    import asyncio
-    import json
-    import time
-    import logging
-    import random
     import aiohttp
-    import re
-    from datetime import datetime, timedelta
-    from typing import Dict, List, Optional, Tuple
     from aiohttp import web
-    from dataclasses import dataclass, field
 except ImportError as e:
     print(f"Import error: {e}")
     print("Installing missing packages...")
@@ -65,26 +36,6 @@ except ImportError as e:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
     sys.exit(1)
 
-# Continue with rest of your code...
-import os
-# Disable cryptg to avoid SSL issues
-os.environ['TELETHON_USE_CRYPTG'] = '0'
-
-# Continue with rest of imports...#!/usr/bin/env python3
-
-import asyncio
-import os
-import json
-import time
-import logging
-import random
-import aiohttp
-import re  # Added missing import
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from aiohttp import web
-from dataclasses import dataclass, field
-
 # Setup logging with more detail
 logging.basicConfig(
     level=logging.INFO, 
@@ -96,21 +47,74 @@ logger = logging.getLogger('TradingBot')
 TELEGRAM_API_ID = os.environ.get('TELEGRAM_API_ID', os.environ.get('TG_API_ID', ''))
 TELEGRAM_API_HASH = os.environ.get('TELEGRAM_API_HASH', os.environ.get('TG_API_HASH', ''))
 
-# Try to import Telegram
+# Fail if required variables are missing for safety
+if not TELEGRAM_API_ID or not TELEGRAM_API_HASH:
+    logger.error("Missing Telegram API credentials. Please set TELEGRAM_API_ID and TELEGRAM_API_HASH.")
+    sys.exit(1)
+
+# Use orjson for JSON encode/decode when installed, stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    json_loads = json.loads
+
+def json_dumps_str(obj) -> str:
+    """JSON serializer for aiohttp client sessions, which expect str"""
+    return json_dumps(obj).decode('utf-8')
+
+def json_response(data, status: int = 200) -> web.Response:
+    """Build a JSON response with the fast serializer"""
+    return web.Response(body=json_dumps(data), status=status, content_type='application/json')
+
+JSON_OFFLOAD_BYTES = 32 * 1024  # Decode bodies larger than this in a worker thread
+
+async def read_json(response: aiohttp.ClientResponse):
+    """Decode an API response, moving large payloads off the event loop"""
+    body = await response.read()
+    if len(body) > JSON_OFFLOAD_BYTES:
+        return await asyncio.to_thread(json_loads, body)
+    return json_loads(body)
+
+# uvloop is a faster drop-in event loop where it is supported
 try:
-    from telethon import TelegramClient, events
-    from telethon.sessions import StringSession
-    TELEGRAM_AVAILABLE = True
+    import uvloop
+    UVLOOP_AVAILABLE = True
 except ImportError:
-    TELEGRAM_AVAILABLE = False
+    UVLOOP_AVAILABLE = False
+
+# Telethon pulls in a lot of modules, so it is only imported on first use
+TELEGRAM_AVAILABLE = importlib.util.find_spec('telethon') is not None
+if not TELEGRAM_AVAILABLE:
     logger.warning("Telegram not available - install telethon to enable trading")
 
+_telethon = None
+
+def _load_telethon():
+    """Import Telethon on first use and return (TelegramClient, StringSession)"""
+    global _telethon
+    if _telethon is None:
+        from telethon import TelegramClient
+        from telethon.sessions import StringSession
+        _telethon = (TelegramClient, StringSession)
+    return _telethon
+
 # Configuration with SAFE DEFAULTS
 HELIUS_API_KEY = os.environ.get('HELIUS_API_KEY', '0f2e5160-d95a-46d7-a0c4-9a71484ab3d8')
 HELIUS_RPC_URL = os.environ.get('HELIUS_RPC_URL', '0f2e5160-d95a-46d7-a0c4-9a71484ab3d8')
 HELIUS_WEBHOOK_URL = os.environ.get('HELIUS_WEBHOOK_URL', '')  # For LaserStream
 HELIUS_SENDER_URL = os.environ.get('HELIUS_SENDER_URL', 'http://ewr-sender.helius-rpc.com/fast')  # For Sender service
 SOLANA_RPC_URL = HELIUS_RPC_URL if HELIUS_RPC_URL else 'https://api.mainnet-beta.solana.com'
+TOXIBOT_USERNAME = os.environ.get('TOXIBOT_USERNAME', 'toxi_solana_bot')
+SESSION_PATH = 'data/session.txt'  # Saved Telethon StringSession
 POSITION_SIZE = 0.01  # Start VERY small - 0.01 SOL per trade
 MIN_LIQUIDITY = 10  # Minimum 10 SOL liquidity for safety
 MAX_TOKEN_AGE = 3600  # 1 hour max age
@@ -118,6 +122,27 @@ MAX_POSITIONS = 3  # Start with only 3 concurrent positions
 MAX_DAILY_LOSS = 0.2  # Maximum 0.2 SOL daily loss (increased from 0.1)
 MAX_POSITION_SIZE = 0.05  # Never risk more than 0.05 SOL per trade
 MIN_WALLET_BALANCE = 0.1  # Keep at least 0.1 SOL for fees
+SOL_USD_FALLBACK = 40.0  # Rough SOL/USD price used when no live price is at hand
+SOL_PER_USD = 1 / SOL_USD_FALLBACK
+HELIUS_BATCH_SIZE = 100  # Max mintAccounts per Helius token-metadata request
+PRICE_PROVIDERS = ('helius', 'dexscreener', 'birdeye')  # Default price source order
+PRICE_PREF_MAX = 4096  # Max tokens remembered in the provider preference table
+HELIUS_MISS_MAX = 4096  # Max tokens remembered as unpriced by Helius
+STATS_PUSH_INTERVAL = 1  # Seconds between dashboard stats snapshots
+STATS_KEEPALIVE = 15  # Seconds between SSE keep-alive comments
+
+# Elapsed-time checks use integer time.monotonic_ns() values
+NS_PER_SEC = 1_000_000_000
+PRICE_CACHE_TTL_NS = 30 * NS_PER_SEC  # Cache token prices for 30 seconds
+SOL_PRICE_CACHE_TTL_NS = 300 * NS_PER_SEC  # Cache SOL/USD for 5 minutes
+CONTRACT_CACHE_TTL_NS = 3600 * NS_PER_SEC  # Cache safety checks for 1 hour
+CONTRACT_CACHE_MAX = 4096  # Max cached safety check results
+RUGCHECK_NOT_FOUND_TTL_NS = 120 * NS_PER_SEC  # Remember RugCheck 404s for 2 minutes
+RUGCHECK_NOT_FOUND_MAX = 2048  # Max remembered RugCheck 404s
+KNOWN_RUG_TTL_NS = 24 * 3600 * NS_PER_SEC  # Remember high-risk tokens for a day
+KNOWN_RUG_MAX = 65536  # Max remembered high-risk tokens
+HOST_BACKOFF_NS = 60 * NS_PER_SEC  # Skip a rate-limited or failing host for a minute
+CHECKED_TOKENS_MAX = 50_000  # Max addresses remembered by token discovery
 
 # Risk Management Settings
 RISK_SETTINGS = {
@@ -132,555 +157,84 @@ RISK_SETTINGS = {
     'min_liquidity_locked': 0.5,  # At least 50% liquidity locked
 }
 
+# Shared read-only default for nested JSON lookups; never mutate
+_EMPTY: Dict = {}
+
+# RugCheck risk severity -> (risk points, warning prefix); unknown counts as low
+_SEVERITY: Dict[str, Tuple[int, str]] = {
+    'critical': (4, '🚨'),
+    'high': (3, '⚠️'),
+    'medium': (2, '⚡'),
+    'low': (1, 'ℹ️'),
+}
+_SEVERITY_LOW = _SEVERITY['low']
+
+# Warning templates for the safety checks, filled with str.format
+_W_OVERALL_HIGH = '🚨 OVERALL RISK SCORE: {}/10 - HIGH RISK'
+_W_OVERALL_MEDIUM = '⚠️ OVERALL RISK SCORE: {}/10 - MEDIUM RISK'
+_W_OVERALL_OK = '✅ OVERALL RISK SCORE: {}/10 - ACCEPTABLE'
+_W_LOW_LIQUIDITY = '⚠️ Very low liquidity: ${:.0f}'
+_W_TOP10 = '{} Top 10 holders own {:.1f}%'
+_W_CREATOR = '⚠️ Creator holds {:.1f}%'
+_W_BUY_TAX = '⚠️ High buy tax: {}%'
+_W_SELL_TAX = '⚠️ High sell tax: {}%'
+_W_TOP_HOLDER = '⚠️ Top holder owns {:.1f}%'
+_W_FEW_HOLDERS = '⚠️ Only {} holders'
+
+# Solana addresses are 32-44 base58 characters
+_BASE58_ADDR_RE = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')
+
+# SOL amounts in ToxiBot trade messages, e.g. "+0.0123 SOL"
+_SOL_AMOUNT_RE = re.compile(r'(\d+\.?\d*)\s*SOL')
+
+@lru_cache(maxsize=4096)  # The same addresses come back every discovery sweep
+def _is_valid_address(address: str) -> bool:
+    """Check a Solana address, rejecting wrong lengths before the regex"""
+    return 32 <= len(address) <= 44 and _BASE58_ADDR_RE.match(address) is not None
+
 # HTML Dashboard
-DASHBOARD_HTML = '''<!DOCTYPE html>
-<html>
-<head>
-    <title>Solana Trading Bot - LIVE</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700;900&display=swap');
-        
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body {
-            font-family: 'Orbitron', monospace;
-            background: #000;
-            color: #00ffff;
-            min-height: 100vh;
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .header {
-            background: #111;
-            padding: 20px;
-            border-bottom: 2px solid #00ffff;
-            text-align: center;
-        }
-        
-        .header h1 {
-            font-size: 2.5em;
-            text-shadow: 0 0 20px #00ffff;
-        }
-        
-        .live-indicator {
-            display: inline-block;
-            background: #00ff00;
-            color: #000;
-            padding: 5px 15px;
-            margin-left: 20px;
-            font-size: 0.8em;
-            font-weight: bold;
-            animation: pulse 2s infinite;
-        }
-        
-        @keyframes pulse {
-            0% { opacity: 1; }
-            50% { opacity: 0.5; }
-            100% { opacity: 1; }
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            flex: 1;
-        }
-        
-        .setup-box {
-            background: #111;
-            border: 2px solid #00ffff;
-            padding: 30px;
-            margin: 20px auto;
-            max-width: 600px;
-            box-shadow: 0 0 30px #00ffff;
-        }
-        
-        .setup-box h2 {
-            color: #00ffff;
-            margin-bottom: 20px;
-            text-align: center;
-        }
-        
-        .step {
-            margin: 20px 0;
-            padding: 20px;
-            background: rgba(0,255,255,0.1);
-            border: 1px solid #00ffff;
-        }
-        
-        .step h3 {
-            color: #ff6600;
-            margin-bottom: 10px;
-        }
-        
-        .step p {
-            line-height: 1.6;
-            margin: 10px 0;
-        }
-        
-        input {
-            width: 100%;
-            padding: 10px;
-            margin: 10px 0;
-            background: #000;
-            border: 2px solid #00ffff;
-            color: #00ffff;
-            font-family: 'Orbitron', monospace;
-            font-size: 16px;
-        }
-        
-        button {
-            width: 100%;
-            padding: 15px;
-            background: transparent;
-            border: 2px solid #ff6600;
-            color: #ff6600;
-            font-family: 'Orbitron', monospace;
-            font-size: 18px;
-            cursor: pointer;
-            text-transform: uppercase;
-            transition: all 0.3s;
-        }
-        
-        button:hover {
-            background: #ff6600;
-            color: #000;
-            box-shadow: 0 0 20px #ff6600;
-        }
-        
-        button:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-        
-        .status {
-            text-align: center;
-            padding: 20px;
-            margin: 20px 0;
-        }
-        
-        .status.online {
-            border: 2px solid #00ff00;
-            background: rgba(0,255,0,0.1);
-        }
-        
-        .status.offline {
-            border: 2px solid #ff0000;
-            background: rgba(255,0,0,0.1);
-        }
-        
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }
-        
-        .stat-card {
-            background: #111;
-            border: 2px solid #00ffff;
-            padding: 20px;
-            text-align: center;
-        }
-        
-        .stat-value {
-            font-size: 2em;
-            color: #00ffff;
-            margin: 10px 0;
-        }
-        
-        .activity {
-            background: #111;
-            border: 2px solid #00ffff;
-            padding: 20px;
-            margin: 20px 0;
-            max-height: 400px;
-            overflow-y: auto;
-        }
-        
-        .activity-item {
-            padding: 10px;
-            margin: 5px 0;
-            background: rgba(0,255,255,0.1);
-            border-left: 4px solid #00ffff;
-        }
-        
-        .activity-item.trade {
-            border-left-color: #00ff00;
-        }
-        
-        .activity-item.error {
-            border-left-color: #ff0000;
-        }
-        
-        .activity-item.sniper {
-            border-left-color: #ff00ff;
-        }
-        
-        .activity-item.scalper {
-            border-left-color: #ffff00;
-        }
-        
-        .activity-item.community {
-            border-left-color: #00ffff;
-        }
-        
-        .hidden { display: none; }
-        
-        .error {
-            color: #ff0000;
-            padding: 10px;
-            margin: 10px 0;
-            border: 1px solid #ff0000;
-            background: rgba(255,0,0,0.1);
-        }
-        
-        .success {
-            color: #00ff00;
-            padding: 10px;
-            margin: 10px 0;
-            border: 1px solid #00ff00;
-            background: rgba(0,255,0,0.1);
-        }
-        
-        .warning {
-            background: rgba(255,165,0,0.2);
-            border: 2px solid #ffa500;
-            padding: 15px;
-            margin: 20px 0;
-            text-align: center;
-        }
-        
-        .api-setup {
-            background: rgba(255,165,0,0.1);
-            border: 2px solid #ffa500;
-            padding: 20px;
-            margin: 20px 0;
-        }
-        
-        .personality-indicator {
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 12px;
-            font-size: 0.8em;
-            font-weight: bold;
-            margin-left: 10px;
-        }
-        
-        .personality-sniper {
-            background: #ff00ff;
-            color: #000;
-        }
-        
-        .personality-scalper {
-            background: #ffff00;
-            color: #000;
-        }
-        
-        .personality-community {
-            background: #00ffff;
-            color: #000;
-        }
-        
-        .risk-indicator {
-            background: rgba(255,0,0,0.2);
-            border: 2px solid #ff0000;
-            padding: 15px;
-            margin: 20px 0;
-        }
-        
-        .risk-indicator h3 {
-            color: #ff0000;
-            margin-bottom: 10px;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🚀 Solana Trading Bot <span class="live-indicator">LIVE TRADING</span></h1>
-    </div>
-    
-    <div class="container">
-        <!-- Setup Section -->
-        <div id="setupSection" class="setup-box">
-            <h2>Bot Setup</h2>
-            
-            <div class="step">
-                <h3>Step 1: Telegram API Setup</h3>
-                <p>You need Telegram API credentials to connect the bot.</p>
-                <p>Already have them? Enter below. Need them? <a href="https://my.telegram.org" target="_blank" style="color: #ff6600;">Get them here</a></p>
-                
-                <input type="text" id="apiId" placeholder="API ID (numbers only, like: 12345678)">
-                <input type="text" id="apiHash" placeholder="API Hash (32 characters, like: abcdef1234567890abcdef1234567890)">
-                
-                <button onclick="saveCredentials()">Save Telegram Credentials</button>
-            </div>
-            
-            <div class="step hidden" id="phoneStep">
-                <h3>Step 2: Phone Number</h3>
-                <p>Enter your phone number to receive a code:</p>
-                <input type="tel" id="phoneInput" placeholder="+1234567890 (include country code)">
-                <button onclick="requestCode()">Send Code to Telegram</button>
-            </div>
-            
-            <div class="step hidden" id="codeStep">
-                <h3>Step 3: Enter Code</h3>
-                <p>Check your Telegram app for the code:</p>
-                <input type="text" id="codeInput" placeholder="12345" maxlength="5">
-                <button onclick="verifyCode()">Start Trading Bot</button>
-            </div>
-            
-            <div id="errorMsg" class="error hidden"></div>
-            <div id="successMsg" class="success hidden"></div>
-        </div>
-        
-        <!-- Trading Dashboard -->
-        <div id="dashboardSection" class="hidden">
-            <div class="warning">
-                ⚠️ LIVE TRADING ACTIVE - Real money at risk! Start with small amounts.
-            </div>
-            
-            <div class="risk-indicator">
-                <h3>Risk Management Active</h3>
-                <p>Max Position: 0.05 SOL | Max Daily Loss: 0.2 SOL | Min Liquidity: 10 SOL</p>
-                <p>Contract Checking: Enabled | Rug Detection: Active</p>
-                <p id="riskStatus">Status: Monitoring...</p>
-            </div>
-            
-            <div class="api-setup" id="apiWarning">
-                <h3>⚠️ Optional: Add Helius API Key for Better Token Discovery</h3>
-                <p>Get a free API key from <a href="https://www.helius.dev/" target="_blank" style="color: #ff6600;">helius.dev</a></p>
-                <p>Add it to Railway environment variables as HELIUS_API_KEY</p>
-            </div>
-            
-            <div class="status" id="botStatus">
-                <h2>Bot Status: <span id="statusText">Offline</span></h2>
-                <p id="toxibotStatus">ToxiBot: Not connected</p>
-                <p id="walletStatus">Wallet Balance: Checking...</p>
-                <p>Active Bots: <span class="personality-indicator personality-sniper">SNIPER</span>
-                                <span class="personality-indicator personality-scalper">SCALPER</span>
-                                <span class="personality-indicator personality-community">COMMUNITY</span></p>
-            </div>
-            
-            <div class="stats">
-                <div class="stat-card">
-                    <h3>Total Profit</h3>
-                    <div class="stat-value" id="totalProfit">0.000 SOL</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Active Trades</h3>
-                    <div class="stat-value" id="activeTrades">0</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Win Rate</h3>
-                    <div class="stat-value" id="winRate">0%</div>
-                </div>
-                <div class="stat-card">
-                    <h3>Tokens Checked</h3>
-                    <div class="stat-value" id="tokensChecked">0</div>
-                </div>
-            </div>
-            
-            <div class="activity">
-                <h3>Live Activity Log</h3>
-                <div id="activityLog">
-                    <div class="activity-item">Waiting for bot to start...</div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        let setupComplete = false;
-        
-        // Check if already setup
-        checkStatus();
-        
-        async function checkStatus() {
-            try {
-                const response = await fetch('/api/status');
-                const data = await response.json();
-                
-                if (data.authenticated) {
-                    showDashboard();
-                    startUpdates();
-                } else if (data.configured) {
-                    document.getElementById('phoneStep').classList.remove('hidden');
-                }
-                
-                // Hide API warning if key is set
-                if (data.hasHeliusKey) {
-                    document.getElementById('apiWarning').style.display = 'none';
-                }
-            } catch (e) {
-                console.log('Not configured yet');
-            }
-        }
-        
-        async function saveCredentials() {
-            const apiId = document.getElementById('apiId').value;
-            const apiHash = document.getElementById('apiHash').value;
-            
-            if (!apiId || !apiHash) {
-                showError('Please enter both API ID and API Hash');
-                return;
-            }
-            
-            try {
-                const response = await fetch('/api/setup', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ api_id: apiId, api_hash: apiHash })
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    showSuccess('Credentials saved! Now enter your phone number.');
-                    document.getElementById('phoneStep').classList.remove('hidden');
-                } else {
-                    showError(data.error || 'Failed to save credentials');
-                }
-            } catch (e) {
-                showError('Connection error');
-            }
-        }
-        
-        async function requestCode() {
-            const phone = document.getElementById('phoneInput').value;
-            
-            if (!phone) {
-                showError('Please enter your phone number');
-                return;
-            }
-            
-            try {
-                const response = await fetch('/api/request-code', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ phone })
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    showSuccess('Code sent! Check your Telegram app.');
-                    document.getElementById('codeStep').classList.remove('hidden');
-                } else {
-                    showError(data.error || 'Failed to send code');
-                }
-            } catch (e) {
-                showError('Connection error');
-            }
-        }
-        
-        async function verifyCode() {
-            const code = document.getElementById('codeInput').value;
-            
-            if (!code) {
-                showError('Please enter the code');
-                return;
-            }
-            
-            try {
-                const response = await fetch('/api/verify-code', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ code })
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    showSuccess('Success! Starting bot...');
-                    setTimeout(() => {
-                        showDashboard();
-                        startUpdates();
-                    }, 2000);
-                } else {
-                    showError(data.error || 'Invalid code');
-                }
-            } catch (e) {
-                showError('Connection error');
-            }
-        }
-        
-        function showDashboard() {
-            document.getElementById('setupSection').classList.add('hidden');
-            document.getElementById('dashboardSection').classList.remove('hidden');
-            document.getElementById('botStatus').classList.add('online');
-            document.getElementById('statusText').textContent = 'Online';
-        }
-        
-        function startUpdates() {
-            // Update stats every 5 seconds
-            setInterval(updateStats, 5000);
-            updateStats();
-        }
-        
-        async function updateStats() {
-            try {
-                const response = await fetch('/api/stats');
-                const data = await response.json();
-                
-                document.getElementById('totalProfit').textContent = data.profit.toFixed(3) + ' SOL';
-                document.getElementById('activeTrades').textContent = data.trades;
-                document.getElementById('winRate').textContent = data.winRate + '%';
-                document.getElementById('tokensChecked').textContent = data.tokensChecked || 0;
-                
-                if (data.walletBalance !== undefined) {
-                    document.getElementById('walletStatus').textContent = `Wallet Balance: ${data.walletBalance.toFixed(3)} SOL`;
-                }
-                
-                if (data.riskStatus) {
-                    document.getElementById('riskStatus').textContent = `Status: ${data.riskStatus}`;
-                }
-                
-                if (data.toxibotConnected) {
-                    document.getElementById('toxibotStatus').textContent = 'ToxiBot: Connected ✓';
-                }
-                
-                if (data.activity) {
-                    addActivity(data.activity, data.activityType);
-                }
-            } catch (e) {
-                console.error('Failed to update stats');
-            }
-        }
-        
-        function addActivity(message, type = 'info') {
-            const log = document.getElementById('activityLog');
-            const item = document.createElement('div');
-            item.className = 'activity-item ' + type;
-            item.textContent = new Date().toLocaleTimeString() + ' - ' + message;
-            log.insertBefore(item, log.firstChild);
-            
-            // Keep only last 20 items
-            while (log.children.length > 20) {
-                log.removeChild(log.lastChild);
-            }
-        }
-        
-        function showError(message) {
-            const elem = document.getElementById('errorMsg');
-            elem.textContent = message;
-            elem.classList.remove('hidden');
-            setTimeout(() => elem.classList.add('hidden'), 5000);
-        }
-        
-        function showSuccess(message) {
-            const elem = document.getElementById('successMsg');
-            elem.textContent = message;
-            elem.classList.remove('hidden');
-            setTimeout(() => elem.classList.add('hidden'), 5000);
-        }
-    </script>
-</body>
-</html>
-'''
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DASHBOARD_PATH = os.path.join(STATIC_DIR, 'index.html')
+
+@lru_cache(maxsize=256)  # Browsers send the same few header values
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header allows gzip with a non-zero q-value"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = (item.strip() for item in part.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    # An explicit gzip (or its x-gzip alias) entry overrides the wildcard
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class Personality:
+    """Immutable trading personality settings"""
+    name: str
+    min_liquidity: float
+    max_age_minutes: int
+    position_size: float
+    take_profit: float
+    stop_loss: float
+    hold_time: int
+    css_class: str
+    min_volume_24h: float
+    min_holders: int
+    limit_buy_offset: float
+    limit_sell_targets: Tuple[float, ...]
+    limit_sell_amounts: Tuple[float, ...]
+
+@dataclass(slots=True)
 class Trade:
     """Track individual trades"""
     token_address: str
@@ -689,22 +243,56 @@ class Trade:
     current_price: float
     position_size: float
     entry_time: float
-    personality: Dict
+    personality: Personality
     stop_loss: float
     take_profit: float
     limit_orders: List[Dict] = field(default_factory=list)
-    
+
+    def update_price(self, price: float):
+        """Set the current price"""
+        self.current_price = price
+
+    def _ratio(self) -> float:
+        # Computed on read so a plain current_price assignment is never stale;
+        # without a known entry price there is no profit or loss to report
+        if not self.entry_price:
+            return 0.0
+        return self.current_price / self.entry_price - 1
+
     @property
     def pnl(self) -> float:
         """Calculate profit/loss"""
-        return self.position_size * (self.current_price / self.entry_price - 1)
-    
+        return self.position_size * self._ratio()
+
     @property
     def pnl_percent(self) -> float:
         """Calculate profit/loss percentage"""
-        return (self.current_price / self.entry_price - 1) * 100
+        return self._ratio() * 100
 
-@dataclass
+@dataclass(slots=True)
+class SafetyResult:
+    """Outcome of a token safety check, as cached by ContractChecker"""
+    is_safe: bool = True
+    risk_score: int = 0  # 0-10, higher = riskier
+    warnings: List[str] = field(default_factory=list)
+    contract_verified: bool = False
+    liquidity_locked: bool = False
+    ownership_renounced: bool = False
+    mint_disabled: bool = False
+    freeze_disabled: bool = False
+    top_holder_percentage: float = 0
+    dev_wallet_percentage: float = 0
+    liquidity_percentage: float = 0
+    rugcheck_score: int = 0
+    rugcheck_analysis: Optional[bool] = None
+    # Filled from RugCheck when it has analysed the token
+    rugcheck_risk: str = 'unknown'
+    lp_burned: bool = False
+    lp_locked: bool = False
+    creator_percentage: float = 0
+    liquidity_usd: float = 0
+
+@dataclass(slots=True)
 class BotState:
     configured: bool = False
     authenticated: bool = False
@@ -720,9 +308,9 @@ class BotState:
     last_activity_type: str = 'info'
     wallet_balance: float = 0.0
     daily_loss: float = 0.0
-    last_loss_time: float = 0
+    last_loss_time: int = 0  # time.monotonic_ns() of the last loss
     trades_this_hour: int = 0
-    hour_start: float = time.time()
+    hour_start: int = field(default_factory=time.monotonic_ns)
     risk_status: str = "Normal"
     active_positions: Dict[str, Trade] = field(default_factory=dict)
 
@@ -732,74 +320,172 @@ bot_state = BotState()
 class BotPersonality:
     """Different trading personalities with SAFE strategies and limit orders"""
     
-    CONSERVATIVE_SNIPER = {
-        'name': 'Conservative Sniper',
-        'min_liquidity': 20,  # Higher liquidity requirement
-        'max_age_minutes': 30,  # Only newer tokens
-        'position_size': 0.01,  # Very small positions
-        'take_profit': 1.5,  # 50% profit target
-        'stop_loss': 0.9,  # -10% stop loss
-        'hold_time': 1800,  # 30 minutes max
-        'css_class': 'sniper',
-        'min_volume_24h': 1000,  # Minimum $1000 daily volume
-        'min_holders': 50,  # At least 50 holders
+    CONSERVATIVE_SNIPER = Personality(
+        name='Conservative Sniper',
+        min_liquidity=20,  # Higher liquidity requirement
+        max_age_minutes=30,  # Only newer tokens
+        position_size=0.01,  # Very small positions
+        take_profit=1.5,  # 50% profit target
+        stop_loss=0.9,  # -10% stop loss
+        hold_time=1800,  # 30 minutes max
+        css_class='sniper',
+        min_volume_24h=1000,  # Minimum $1000 daily volume
+        min_holders=50,  # At least 50 holders
         # Limit order settings
-        'limit_buy_offset': 0.95,  # Buy at 5% below current price
-        'limit_sell_targets': [1.15, 1.3, 1.5],  # 15%, 30%, 50% profit targets
-        'limit_sell_amounts': [0.3, 0.4, 0.3],  # Sell 30%, 40%, 30% at each target
-    }
+        limit_buy_offset=0.95,  # Buy at 5% below current price
+        limit_sell_targets=(1.15, 1.3, 1.5),  # 15%, 30%, 50% profit targets
+        limit_sell_amounts=(0.3, 0.4, 0.3),  # Sell 30%, 40%, 30% at each target
+    )
     
-    SAFE_SCALPER = {
-        'name': 'Safe Scalper',
-        'min_liquidity': 50,
-        'max_age_minutes': 120,
-        'position_size': 0.02,
-        'take_profit': 1.2,  # 20% profit
-        'stop_loss': 0.95,  # -5% stop loss
-        'hold_time': 3600,  # 1 hour max
-        'css_class': 'scalper',
-        'min_volume_24h': 5000,
-        'min_holders': 100,
+    SAFE_SCALPER = Personality(
+        name='Safe Scalper',
+        min_liquidity=50,
+        max_age_minutes=120,
+        position_size=0.02,
+        take_profit=1.2,  # 20% profit
+        stop_loss=0.95,  # -5% stop loss
+        hold_time=3600,  # 1 hour max
+        css_class='scalper',
+        min_volume_24h=5000,
+        min_holders=100,
         # Limit order settings
-        'limit_buy_offset': 0.98,  # Buy at 2% below current price
-        'limit_sell_targets': [1.05, 1.1, 1.2],  # 5%, 10%, 20% profit targets
-        'limit_sell_amounts': [0.4, 0.3, 0.3],  # Sell 40%, 30%, 30% at each target
-    }
+        limit_buy_offset=0.98,  # Buy at 2% below current price
+        limit_sell_targets=(1.05, 1.1, 1.2),  # 5%, 10%, 20% profit targets
+        limit_sell_amounts=(0.4, 0.3, 0.3),  # Sell 40%, 30%, 30% at each target
+    )
     
-    ESTABLISHED_TRADER = {
-        'name': 'Established Trader',
-        'min_liquidity': 100,
-        'max_age_minutes': 1440,  # 24 hours
-        'position_size': 0.03,
-        'take_profit': 1.3,
-        'stop_loss': 0.93,  # -7% stop loss
-        'hold_time': 7200,  # 2 hours max
-        'css_class': 'community',
-        'min_volume_24h': 10000,
-        'min_holders': 200,
+    ESTABLISHED_TRADER = Personality(
+        name='Established Trader',
+        min_liquidity=100,
+        max_age_minutes=1440,  # 24 hours
+        position_size=0.03,
+        take_profit=1.3,
+        stop_loss=0.93,  # -7% stop loss
+        hold_time=7200,  # 2 hours max
+        css_class='community',
+        min_volume_24h=10000,
+        min_holders=200,
         # Limit order settings
-        'limit_buy_offset': 0.97,  # Buy at 3% below current price
-        'limit_sell_targets': [1.1, 1.2, 1.3],  # 10%, 20%, 30% profit targets
-        'limit_sell_amounts': [0.3, 0.3, 0.4],  # Sell 30%, 30%, 40% at each target
-    }
+        limit_buy_offset=0.97,  # Buy at 3% below current price
+        limit_sell_targets=(1.1, 1.2, 1.3),  # 10%, 20%, 30% profit targets
+        limit_sell_amounts=(0.3, 0.3, 0.4),  # Sell 30%, 30%, 40% at each target
+    )
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded LRU mapping whose entries optionally expire after ttl_ns"""
+    
+    def __init__(self, maxsize: int, ttl_ns: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl_ns = ttl_ns
+        self._data = OrderedDict()  # key -> (expires_ns or None, value)
+        
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_ns, value = item
+        if expires_ns is not None and time.monotonic_ns() >= expires_ns:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+        
+    def __setitem__(self, key, value):
+        self.set(key, value)
+        
+    def set(self, key, value, ttl_ns: Optional[int] = None):
+        """Store value, expiring after ttl_ns instead of the default if given"""
+        if ttl_ns is None:
+            ttl_ns = self.ttl_ns
+        expires_ns = None if ttl_ns is None else time.monotonic_ns() + ttl_ns
+        self._data[key] = (expires_ns, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+        
+    def __len__(self) -> int:
+        return len(self._data)
+        
+    def add(self, key):
+        """Use the cache as a bounded set"""
+        self[key] = True
+
+# One HTTP session shared by every API client for connection and DNS reuse
+_session: Optional[aiohttp.ClientSession] = None
+
+# Default headers for every API request; aiohttp decompresses transparently
+_API_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'solana-safe-trading-bot/2.0',
+}
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Return the process-wide HTTP session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                # Outlive the ~15s discovery cycle so pooled connections are
+                # still warm on the next sweep (aiohttp default is 15s)
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            ),
+            timeout=aiohttp.ClientTimeout(total=15, connect=5),
+            headers=_API_HEADERS,
+            json_serialize=json_dumps_str
+        )
+    return _session
+
+async def close_session():
+    """Close the shared HTTP session on shutdown"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
 
 class PriceChecker:
     """Check real token prices using multiple sources"""
     
     def __init__(self):
-        self.session = None
         self.price_cache = {}
-        self.cache_duration = 30  # Cache prices for 30 seconds
+        self.cache_duration_ns = PRICE_CACHE_TTL_NS
+        # Provider that last returned a price for each token, in LRU order
+        self._pref = OrderedDict()
+        self._price_sources = {
+            'helius': self._get_price_from_helius,
+            'dexscreener': self._get_price_from_dexscreener,
+            'birdeye': self._get_price_from_birdeye,
+        }
+        # Single-flight: concurrent misses share one upstream lookup
+        self._price_inflight: Dict[str, asyncio.Future] = {}
+        # Tokens a recent Helius batch answered without a price
+        self._helius_misses = TTLCache(HELIUS_MISS_MAX, PRICE_CACHE_TTL_NS)
+        self._sol_price_lock = asyncio.Lock()
         
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return await get_shared_session()
         
     async def _get_price_from_helius(self, token_address: str) -> Optional[float]:
-        """Get price using Helius RPC (premium)"""
-        if not HELIUS_RPC_URL:
+        """Get price using Helius RPC (premium) for a single cold-start token"""
+        if token_address in self._helius_misses:
             return None
+        prices = await self.get_prices_batch([token_address])
+        return prices.get(token_address)
+        
+    async def get_prices_batch(self, token_addresses: List[str]) -> Dict[str, float]:
+        """Get prices for many tokens at once, 100 mints per Helius request"""
+        prices = {}
+        if not HELIUS_RPC_URL or not token_addresses:
+            return prices
             
         try:
             session = await self.get_session()
@@ -807,61 +493,89 @@ class PriceChecker:
             # Helius enhanced API for token prices
             url = f"{HELIUS_RPC_URL.replace('?api-key=', '/v0/token-metadata?api-key=')}"
             
-            payload = {
-                "mintAccounts": [token_address],
-                "includeOffChain": True,
-                "disableCache": False
-            }
-            
-            async with session.post(url, json=payload, timeout=5) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    # Parse price from Helius response
+            for start in range(0, len(token_addresses), HELIUS_BATCH_SIZE):
+                chunk = token_addresses[start:start + HELIUS_BATCH_SIZE]
+                payload = {
+                    "mintAccounts": chunk,
+                    "includeOffChain": True,
+                    "disableCache": False
+                }
+                
+                async with session.post(url, json=payload, timeout=5) as response:
+                    if response.status != 200:
+                        continue
+                    data = await read_json(response)
+                    now = time.monotonic_ns()
+                    
+                    # Parse prices from Helius response
                     for token_data in data:
-                        if token_data.get('account') == token_address:
-                            # Get price info
-                            on_chain_info = token_data.get('onChainAccountInfo', {})
-                            price_info = token_data.get('priceInfo', {})
+                        price_info = token_data.get('priceInfo') or {}
+                        if not price_info.get('pricePerToken'):
+                            continue
                             
-                            if price_info and price_info.get('pricePerToken'):
-                                return float(price_info['pricePerToken'])
-                                
+                        address = token_data.get('account')
+                        price = float(price_info['pricePerToken'])
+                        prices[address] = price
+                        self.price_cache[f"{address}_price"] = {
+                            'price': price,
+                            'timestamp_ns': now
+                        }
+                        
+                    # Skip Helius for the rest of this chunk until the TTL lapses
+                    for address in chunk:
+                        if address not in prices:
+                            self._helius_misses.add(address)
+                        
         except Exception as e:
             logger.debug(f"Helius price error: {e}")
             
-        return None
+        return prices
         
     async def get_token_price(self, token_address: str) -> Optional[float]:
-        """Get token price in SOL with Helius priority"""
+        """Get token price in SOL, trying the token's last good provider first"""
         # Check cache first
         cache_key = f"{token_address}_price"
         if cache_key in self.price_cache:
             cached_data = self.price_cache[cache_key]
-            if time.time() - cached_data['timestamp'] < self.cache_duration:
+            if time.monotonic_ns() - cached_data['timestamp_ns'] < self.cache_duration_ns:
                 return cached_data['price']
         
-        # Try Helius first (fastest with premium RPC)
-        if HELIUS_RPC_URL:
-            price = await self._get_price_from_helius(token_address)
+        # Join a lookup already in flight for this token rather than racing it
+        pending = self._price_inflight.get(token_address)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_token_price(token_address, cache_key))
+            self._price_inflight[token_address] = pending
+            pending.add_done_callback(lambda _: self._price_inflight.pop(token_address, None))
+        # Shield so one cancelled caller doesn't cancel the shared lookup
+        return await asyncio.shield(pending)
+        
+    async def _fetch_token_price(self, token_address: str, cache_key: str) -> Optional[float]:
+        for provider in self._provider_order(token_address):
+            price = await self._price_sources[provider](token_address)
             if price:
+                self._remember_provider(token_address, provider)
                 self.price_cache[cache_key] = {
                     'price': price,
-                    'timestamp': time.time()
+                    'timestamp_ns': time.monotonic_ns()
                 }
                 return price
+                
+        # Nobody had a price, so start from the default order next time
+        self._pref.pop(token_address, None)
+        return None
         
-        # Fall back to other sources
-        price = await self._get_price_from_dexscreener(token_address)
-        if not price:
-            price = await self._get_price_from_birdeye(token_address)
+    def _provider_order(self, token_address: str) -> Tuple[str, ...]:
+        """Default provider order with the token's preferred provider moved first"""
+        preferred = self._pref.get(token_address)
+        if preferred is None:
+            return PRICE_PROVIDERS
+        return (preferred,) + tuple(p for p in PRICE_PROVIDERS if p != preferred)
         
-        if price:
-            self.price_cache[cache_key] = {
-                'price': price,
-                'timestamp': time.time()
-            }
-            
-        return price
+    def _remember_provider(self, token_address: str, provider: str):
+        self._pref[token_address] = provider
+        self._pref.move_to_end(token_address)
+        if len(self._pref) > PRICE_PREF_MAX:
+            self._pref.popitem(last=False)
         
     async def _get_price_from_dexscreener(self, token_address: str) -> Optional[float]:
         """Get price from DexScreener"""
@@ -871,15 +585,21 @@ class PriceChecker:
             
             async with session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    pairs = data.get('pairs', [])
-                    
-                    # Find SOL pair with highest liquidity
-                    sol_pairs = [p for p in pairs if p.get('quoteToken', {}).get('symbol') == 'SOL']
-                    if sol_pairs:
-                        # Sort by liquidity
-                        sol_pairs.sort(key=lambda x: x.get('liquidity', {}).get('usd', 0), reverse=True)
-                        price_sol = float(sol_pairs[0].get('priceNative', 0))
+                    data = await read_json(response)
+
+                    # Find SOL pair with highest liquidity in a single pass
+                    best_pair = None
+                    best_liquidity = -1
+                    for pair in data.get('pairs') or ():
+                        if (pair.get('quoteToken') or {}).get('symbol') != 'SOL':
+                            continue
+                        liquidity = (pair.get('liquidity') or {}).get('usd', 0)
+                        if liquidity > best_liquidity:
+                            best_pair = pair
+                            best_liquidity = liquidity
+
+                    if best_pair:
+                        price_sol = float(best_pair.get('priceNative', 0))
                         return price_sol
                         
         except Exception as e:
@@ -895,7 +615,7 @@ class PriceChecker:
             
             async with session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await read_json(response)
                     if data.get('success'):
                         # Convert USD price to SOL price
                         usd_price = data.get('data', {}).get('value', 0)
@@ -910,74 +630,95 @@ class PriceChecker:
         
     async def _get_sol_price(self) -> Optional[float]:
         """Get SOL price in USD"""
-        cache_key = "SOL_USD"
-        if cache_key in self.price_cache:
-            cached_data = self.price_cache[cache_key]
-            if time.time() - cached_data['timestamp'] < 300:  # 5 min cache
-                return cached_data['price']
+        price = self._cached_sol_price()
+        if price is not None:
+            return price
+            
+        async with self._sol_price_lock:
+            # Another caller may have refreshed it while we waited
+            price = self._cached_sol_price()
+            if price is not None:
+                return price
                 
-        try:
-            session = await self.get_session()
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
-            
-            async with session.get(url, timeout=5) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data.get('solana', {}).get('usd', 0)
-                    if price:
-                        self.price_cache[cache_key] = {
-                            'price': price,
-                            'timestamp': time.time()
-                        }
-                        return price
-                        
-        except Exception as e:
-            logger.error(f"SOL price error: {e}")
-            
-        return 40.0  # Fallback SOL price
+            try:
+                session = await self.get_session()
+                url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
+                
+                async with session.get(url, timeout=5) as response:
+                    if response.status == 200:
+                        data = await read_json(response)
+                        price = data.get('solana', {}).get('usd', 0)
+                        if price:
+                            self.price_cache["SOL_USD"] = {
+                                'price': price,
+                                'timestamp_ns': time.monotonic_ns()
+                            }
+                            return price
+                            
+            except Exception as e:
+                logger.error(f"SOL price error: {e}")
+                
+        return SOL_USD_FALLBACK
+        
+    def _cached_sol_price(self) -> Optional[float]:
+        cached_data = self.price_cache.get("SOL_USD")
+        if cached_data and time.monotonic_ns() - cached_data['timestamp_ns'] < SOL_PRICE_CACHE_TTL_NS:
+            return cached_data['price']
+        return None
 
 class ContractChecker:
     """Check token contracts for safety and rug pull risks"""
     
     def __init__(self):
-        self.session = None
-        self.checked_contracts = {}
+        self.checked_contracts = TTLCache(CONTRACT_CACHE_MAX, CONTRACT_CACHE_TTL_NS)
+        # Tokens RugCheck has not indexed yet, so repeat sweeps skip the 404
+        self._rugcheck_not_found = TTLCache(RUGCHECK_NOT_FOUND_MAX, RUGCHECK_NOT_FOUND_TTL_NS)
+        # Address -> risk score of tokens that scored 7+, kept well past the
+        # full result cache so re-listed rugs skip every lookup
+        self._known_rug = TTLCache(KNOWN_RUG_MAX, KNOWN_RUG_TTL_NS)
+        # Checks in progress, shared by concurrent callers for the same token
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # host -> monotonic_ns when a tripped host may be called again
+        self._host_failures: Dict[str, int] = {}
         
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return await get_shared_session()
         
     async def check_token_safety(self, token_address: str) -> Dict:
         """Comprehensive token safety check with RugCheck.xyz as primary source"""
-        # Check cache first
-        if token_address in self.checked_contracts:
-            cached = self.checked_contracts[token_address]
-            if time.time() - cached['timestamp'] < 3600:  # 1 hour cache
-                return cached['result']
-        
-        result = {
-            'is_safe': True,
-            'risk_score': 0,  # 0-10, higher = riskier
-            'warnings': [],
-            'contract_verified': False,
-            'liquidity_locked': False,
-            'ownership_renounced': False,
-            'mint_disabled': False,
-            'freeze_disabled': False,
-            'top_holder_percentage': 0,
-            'dev_wallet_percentage': 0,
-            'liquidity_percentage': 0,
-            'rugcheck_score': 0,
-            'rugcheck_analysis': None
-        }
+        # Check cache first; results are cached as compact SafetyResults and
+        # only turned into dicts for callers
+        cached = self.checked_contracts.get(token_address)
+        if cached is not None:
+            return asdict(cached)
+            
+        known_risk = self._known_rug.get(token_address)
+        if known_risk is not None:
+            return asdict(SafetyResult(
+                is_safe=False,
+                risk_score=known_risk,
+                warnings=[_W_OVERALL_HIGH.format(known_risk), "🚨 Known high-risk token (cached)"]
+            ))
+            
+        # Join a check already in flight for this token rather than repeating it
+        pending = self._inflight.get(token_address)
+        if pending is None:
+            pending = asyncio.ensure_future(self._run_safety_check(token_address))
+            self._inflight[token_address] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(token_address, None))
+        # Shield so one cancelled caller doesn't cancel the shared check
+        return asdict(await asyncio.shield(pending))
+        
+    async def _run_safety_check(self, token_address: str) -> SafetyResult:
+        result = SafetyResult()
         
         try:
             # Primary check: RugCheck.xyz (most comprehensive)
             rugcheck_data = await self._check_rugcheck(token_address)
             if rugcheck_data:
-                result.update(rugcheck_data)
-                result['rugcheck_analysis'] = True
+                for key, value in rugcheck_data.items():
+                    setattr(result, key, value)
+                result.rugcheck_analysis = True
                 
                 # If RugCheck gives high confidence data, we can skip other checks
                 if rugcheck_data.get('rugcheck_score', 0) > 0:
@@ -986,92 +727,90 @@ class ContractChecker:
                     
                     # Early exit for very risky tokens
                     if rugcheck_data['risk_score'] >= 7:
-                        result['is_safe'] = False
-                        result['warnings'].insert(0, "🚨 RUGCHECK: HIGH RISK - DO NOT TRADE")
-            
-            # If RugCheck didn't provide full data or token is borderline, do additional checks
-            if not rugcheck_data or rugcheck_data['risk_score'] >= 4:
-                # Secondary check: Holder distribution
-                holder_data = await self._check_holder_distribution(token_address)
-                if holder_data:
-                    # Merge holder data, taking worst case
-                    if holder_data['risk_score'] > result['risk_score']:
-                        result['risk_score'] = holder_data['risk_score']
-                    result['warnings'].extend(holder_data.get('warnings', []))
-                    
-                # Tertiary check: Token metadata and trading patterns
-                metadata = await self._check_token_metadata(token_address)
-                if metadata:
-                    # Merge metadata, taking worst case
-                    if metadata['risk_score'] > result['risk_score']:
-                        result['risk_score'] = metadata['risk_score']
-                    result['warnings'].extend(metadata.get('warnings', []))
+                        result.is_safe = False
+                        result.warnings.insert(0, "🚨 RUGCHECK: HIGH RISK - DO NOT TRADE")
+            
+            # A 404 gives only the "too new" placeholder, not a report
+            rugcheck_reported = bool(rugcheck_data) and token_address not in self._rugcheck_not_found
+            
+            # Secondary checks only for missing RugCheck data or borderline
+            # tokens (4-6); at 7+ they could only confirm a rejection
+            if not rugcheck_data or 4 <= rugcheck_data['risk_score'] < 7:
+                # Secondary checks (holder distribution, token metadata and
+                # trading patterns) are independent, so run them concurrently
+                holder_data, metadata = await asyncio.gather(
+                    self._check_holder_distribution(token_address),
+                    self._check_token_metadata(token_address)
+                )
+                
+                # Merge secondary results, taking worst case. A check that
+                # answered without a risk score verified nothing, and without
+                # a RugCheck report something else must have verified the token.
+                if not rugcheck_reported and not (holder_data or metadata):
+                    raise ValueError("no safety source answered")
+                for extra in (holder_data, metadata):
+                    if extra:
+                        if 'risk_score' not in extra:
+                            raise ValueError("secondary check returned no risk score")
+                        if extra['risk_score'] > result.risk_score:
+                            result.risk_score = extra['risk_score']
+                        result.warnings.extend(extra.get('warnings', []))
             
             # Final safety determination
-            result['is_safe'] = result['risk_score'] < 7
+            result.is_safe = result.risk_score < 7
             
             # Add summary warning if risky
-            if result['risk_score'] >= 7:
-                result['warnings'].insert(0, f"🚨 OVERALL RISK SCORE: {result['risk_score']}/10 - HIGH RISK")
-            elif result['risk_score'] >= 5:
-                result['warnings'].insert(0, f"⚠️ OVERALL RISK SCORE: {result['risk_score']}/10 - MEDIUM RISK")
+            if result.risk_score >= 7:
+                result.warnings.insert(0, _W_OVERALL_HIGH.format(result.risk_score))
+            elif result.risk_score >= 5:
+                result.warnings.insert(0, _W_OVERALL_MEDIUM.format(result.risk_score))
             else:
-                result['warnings'].insert(0, f"✅ OVERALL RISK SCORE: {result['risk_score']}/10 - ACCEPTABLE")
+                result.warnings.insert(0, _W_OVERALL_OK.format(result.risk_score))
             
-            # Cache result
-            self.checked_contracts[token_address] = {
-                'result': result,
-                'timestamp': time.time()
-            }
+            # Cache result; without a RugCheck report, only until RugCheck
+            # may have indexed the token
+            self.checked_contracts.set(
+                token_address, result,
+                None if rugcheck_reported else RUGCHECK_NOT_FOUND_TTL_NS
+            )
+            if result.risk_score >= 7:
+                self._known_rug[token_address] = result.risk_score
             
         except Exception as e:
             logger.error(f"Contract check error for {token_address}: {e}")
-            result['is_safe'] = False
-            result['warnings'].append("Failed to verify contract safety")
-            result['risk_score'] = 8  # High risk if we can't verify
+            result.is_safe = False
+            result.warnings.append("Failed to verify contract safety")
+            result.risk_score = 8  # High risk if we can't verify
             
         return result
         
     async def _check_rugcheck(self, token_address: str) -> Optional[Dict]:
         """Check RugCheck.xyz for comprehensive token safety analysis"""
+        if token_address in self._rugcheck_not_found:
+            return self._rugcheck_too_new()
+            
         try:
             session = await self.get_session()
             
             # RugCheck.xyz API endpoint - using their full report
             url = f"https://api.rugcheck.xyz/v1/tokens/{token_address}/report"
             
-            # Alternative endpoint for detailed analysis
-            detailed_url = f"https://rugcheck.xyz/api/v1/report/{token_address}"
-            
             async with session.get(url, timeout=10) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await read_json(response)
                     
                     risk_score = 0
-                    warnings = []
+                    warnings = deque()
                     
                     # Parse RugCheck's risk assessment
-                    if 'risks' in data:
-                        # RugCheck provides categorized risks
-                        for risk in data.get('risks', []):
-                            severity = risk.get('severity', 'low')
-                            description = risk.get('description', '')
-                            
-                            if severity == 'critical':
-                                risk_score += 4
-                                warnings.append(f"🚨 {description}")
-                            elif severity == 'high':
-                                risk_score += 3
-                                warnings.append(f"⚠️ {description}")
-                            elif severity == 'medium':
-                                risk_score += 2
-                                warnings.append(f"⚡ {description}")
-                            else:
-                                risk_score += 1
-                                warnings.append(f"ℹ️ {description}")
+                    # RugCheck provides categorized risks
+                    for risk in data.get('risks') or ():
+                        score, prefix = _SEVERITY.get(risk.get('severity'), _SEVERITY_LOW)
+                        risk_score += score
+                        warnings.append(f"{prefix} {risk.get('description', '')}")
                     
                     # Check specific flags from RugCheck
-                    token_info = data.get('token', {})
+                    token_info = data.get('token') or _EMPTY
                     
                     # Mint Authority
                     if token_info.get('mint_authority'):
@@ -1086,9 +825,14 @@ class ContractChecker:
                             warnings.append("⚠️ Freeze authority still active")
                     
                     # LP (Liquidity Pool) Analysis
-                    lp_info = data.get('liquidity_pools', [])
+                    lp_info = data.get('liquidity_pools') or ()
+                    lp_burned = lp_locked = False
+                    main_liquidity_usd = 0
+                    for pool in lp_info:
+                        lp_burned = lp_burned or bool(pool.get('lp_burned'))
+                        lp_locked = lp_locked or bool(pool.get('lp_locked'))
                     if lp_info:
-                        main_pool = lp_info[0] if lp_info else {}
+                        main_pool = lp_info[0]
                         
                         # Check LP burn/lock status
                         if not main_pool.get('lp_burned') and not main_pool.get('lp_locked'):
@@ -1096,44 +840,44 @@ class ContractChecker:
                             warnings.append("⚠️ LP tokens not burned or locked")
                             
                         # Check liquidity amount
-                        liquidity_usd = main_pool.get('liquidity_usd', 0)
-                        if liquidity_usd < 1000:
+                        main_liquidity_usd = main_pool.get('liquidity_usd', 0)
+                        if main_liquidity_usd < 1000:
                             risk_score += 2
-                            warnings.append(f"⚠️ Very low liquidity: ${liquidity_usd:.0f}")
+                            warnings.append(_W_LOW_LIQUIDITY.format(main_liquidity_usd))
                     
                     # Ownership and control
-                    ownership = data.get('ownership', {})
+                    ownership = data.get('ownership') or _EMPTY
                     if ownership.get('renounced') == False:
                         risk_score += 2
                         warnings.append("⚠️ Ownership not renounced")
                         
                     # Holder distribution
-                    holders = data.get('holders', {})
+                    holders = data.get('holders') or _EMPTY
                     top_10_percentage = holders.get('top_10_percentage', 0)
                     if top_10_percentage > 70:
                         risk_score += 3
-                        warnings.append(f"⚠️ Top 10 holders own {top_10_percentage:.1f}%")
+                        warnings.append(_W_TOP10.format('⚠️', top_10_percentage))
                     elif top_10_percentage > 50:
                         risk_score += 2
-                        warnings.append(f"⚡ Top 10 holders own {top_10_percentage:.1f}%")
+                        warnings.append(_W_TOP10.format('⚡', top_10_percentage))
                         
                     # Creator holdings
                     creator_percentage = holders.get('creator_percentage', 0)
                     if creator_percentage > 10:
                         risk_score += 3
-                        warnings.append(f"⚠️ Creator holds {creator_percentage:.1f}%")
+                        warnings.append(_W_CREATOR.format(creator_percentage))
                         
                     # Market and trading analysis
-                    market = data.get('market', {})
+                    market = data.get('market') or _EMPTY
                     
                     # Check for honeypot indicators
                     if market.get('buy_tax', 0) > 10:
                         risk_score += 2
-                        warnings.append(f"⚠️ High buy tax: {market['buy_tax']}%")
+                        warnings.append(_W_BUY_TAX.format(market['buy_tax']))
                         
                     if market.get('sell_tax', 0) > 10:
                         risk_score += 3
-                        warnings.append(f"⚠️ High sell tax: {market['sell_tax']}%")
+                        warnings.append(_W_SELL_TAX.format(market['sell_tax']))
                         
                     # Trading pattern analysis
                     if market.get('unique_wallets_24h', 0) < 10:
@@ -1152,64 +896,62 @@ class ContractChecker:
                         
                     # Add overall assessment
                     if overall_risk == 'high' or rugcheck_score < 30:
-                        warnings.insert(0, "🚨 RugCheck: HIGH RISK TOKEN")
+                        warnings.appendleft("🚨 RugCheck: HIGH RISK TOKEN")
                     elif overall_risk == 'medium' or rugcheck_score < 60:
-                        warnings.insert(0, "⚠️ RugCheck: MEDIUM RISK")
+                        warnings.appendleft("⚠️ RugCheck: MEDIUM RISK")
                     elif overall_risk == 'low' or rugcheck_score >= 60:
-                        warnings.insert(0, "✅ RugCheck: Relatively safe")
+                        warnings.appendleft("✅ RugCheck: Relatively safe")
                         
                     return {
                         'risk_score': min(10, risk_score),  # Cap at 10
-                        'warnings': warnings,
+                        'warnings': list(warnings),
                         'rugcheck_score': rugcheck_score,
                         'rugcheck_risk': overall_risk,
                         'mint_disabled': token_info.get('mint_authority_disabled', False),
                         'freeze_disabled': token_info.get('freeze_authority_disabled', False),
                         'ownership_renounced': ownership.get('renounced', False),
-                        'lp_burned': any(pool.get('lp_burned', False) for pool in lp_info),
-                        'lp_locked': any(pool.get('lp_locked', False) for pool in lp_info),
+                        'lp_burned': lp_burned,
+                        'lp_locked': lp_locked,
                         'top_holder_percentage': holders.get('top_1_percentage', 0),
                         'creator_percentage': creator_percentage,
-                        'liquidity_usd': lp_info[0].get('liquidity_usd', 0) if lp_info else 0
+                        'liquidity_usd': main_liquidity_usd
                     }
                     
                 elif response.status == 404:
                     # Token not found in RugCheck - likely very new
-                    return {
-                        'risk_score': 5,
-                        'warnings': ['ℹ️ Token too new for RugCheck analysis'],
-                        'rugcheck_score': 0,
-                        'rugcheck_risk': 'unknown'
-                    }
+                    self._rugcheck_not_found.add(token_address)
+                    return self._rugcheck_too_new()
                     
         except Exception as e:
             logger.debug(f"RugCheck API error: {e}")
             
         return None
         
+    @staticmethod
+    def _rugcheck_too_new() -> Dict:
+        """Default result for tokens RugCheck has not analysed yet"""
+        return {
+            'risk_score': 5,
+            'warnings': ['ℹ️ Token too new for RugCheck analysis'],
+            'rugcheck_score': 0,
+            'rugcheck_risk': 'unknown'
+        }
+        
     async def _check_holder_distribution(self, token_address: str) -> Optional[Dict]:
         """Check token holder distribution"""
         try:
             session = await self.get_session()
             
-            # Try Helius first if available
-            if HELIUS_API_KEY:
-                url = f"https://api.helius.xyz/v0/token-metadata?api-key={HELIUS_API_KEY}"
-                payload = {"mintAccounts": [token_address]}
-                
-                async with session.post(url, json=payload, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Parse holder data
-                        return await self._parse_holder_data(data)
-                        
-            # Fallback to other sources
-            # Check Solscan API (limited free tier)
+            # Helius token-metadata carries no holder breakdown, so go
+            # straight to Solscan (limited free tier, often rate limited)
+            if not self._host_available('public-api.solscan.io'):
+                return None
             url = f"https://public-api.solscan.io/token/holders?tokenAddress={token_address}&limit=10"
             
             async with session.get(url, timeout=10) as response:
+                self._check_host_status('public-api.solscan.io', response.status)
                 if response.status == 200:
-                    data = await response.json()
+                    data = await read_json(response)
                     
                     if data.get('data'):
                         holders = data['data']
@@ -1224,11 +966,11 @@ class ContractChecker:
                         
                         if top_holder_percent > 20:
                             risk_score += 3
-                            warnings.append(f"⚠️ Top holder owns {top_holder_percent:.1f}%")
+                            warnings.append(_W_TOP_HOLDER.format(top_holder_percent))
                             
                         if len(holders) < 10:
                             risk_score += 2
-                            warnings.append(f"⚠️ Only {len(holders)} holders")
+                            warnings.append(_W_FEW_HOLDERS.format(len(holders)))
                             
                         return {
                             'top_holder_percentage': top_holder_percent,
@@ -1237,11 +979,27 @@ class ContractChecker:
                             'warnings': warnings
                         }
                         
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            self._trip_host('public-api.solscan.io')
+            logger.debug(f"Holder check error: {e}")
         except Exception as e:
             logger.debug(f"Holder check error: {e}")
             
         return None
         
+    def _host_available(self, host: str) -> bool:
+        """False while the host's circuit breaker is open"""
+        return self._host_failures.get(host, 0) <= time.monotonic_ns()
+        
+    def _trip_host(self, host: str):
+        self._host_failures[host] = time.monotonic_ns() + HOST_BACKOFF_NS
+        logger.debug(f"Backing off {host} for {HOST_BACKOFF_NS // NS_PER_SEC}s")
+        
+    def _check_host_status(self, host: str, status: int):
+        """Trip the breaker on rate limiting or server errors"""
+        if status == 429 or status >= 500:
+            self._trip_host(host)
+        
     async def _check_token_metadata(self, token_address: str) -> Optional[Dict]:
         """Check token metadata for red flags"""
         try:
@@ -1252,7 +1010,7 @@ class ContractChecker:
             
             async with session.get(url, timeout=10) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await read_json(response)
                     pairs = data.get('pairs', [])
                     
                     if pairs:
@@ -1261,14 +1019,14 @@ class ContractChecker:
                         
                         # Check liquidity locks
                         for pair in pairs:
-                            liquidity = pair.get('liquidity', {})
-                            if liquidity.get('usd', 0) < 1000:
+                            if (pair.get('liquidity') or _EMPTY).get('usd', 0) < 1000:
                                 risk_score += 2
                                 warnings.append("⚠️ Very low liquidity")
                                 
                             # Check for honeypot indicators
-                            buys = pair.get('txns', {}).get('h24', {}).get('buys', 0)
-                            sells = pair.get('txns', {}).get('h24', {}).get('sells', 0)
+                            h24 = (pair.get('txns') or _EMPTY).get('h24') or _EMPTY
+                            buys = h24.get('buys', 0)
+                            sells = h24.get('sells', 0)
                             
                             if buys > 10 and sells == 0:
                                 risk_score += 5
@@ -1281,70 +1039,69 @@ class ContractChecker:
                         return {
                             'risk_score': risk_score,
                             'warnings': warnings,
-                            'liquidity_usd': pairs[0].get('liquidity', {}).get('usd', 0) if pairs else 0
+                            'liquidity_usd': (pairs[0].get('liquidity') or _EMPTY).get('usd', 0)
                         }
                         
         except Exception as e:
             logger.debug(f"Metadata check error: {e}")
             
         return None
-        
-    async def _parse_holder_data(self, data: Dict) -> Dict:
-        """Parse holder data from various sources"""
-        # Implementation depends on data format
-        return {
-            'holder_count': 0,
-            'top_holder_percentage': 0,
-            'warnings': []
-        }
 
 class TokenDiscovery:
     """Discover new tokens from multiple sources"""
     
     def __init__(self):
-        self.session = None
-        self.checked_tokens = set()
+        self.checked_tokens = TTLCache(CHECKED_TOKENS_MAX)
         self.price_checker = PriceChecker()
         self.contract_checker = ContractChecker()
         
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        return await get_shared_session()
         
     async def discover_tokens(self) -> List[Dict]:
         """Discover new tokens from various sources"""
-        tokens = []
-        
-        # Try multiple discovery methods
+        # Always try free sources, plus Helius when configured, all concurrently
+        sources = [
+            self.get_dexscreener_tokens(),
+            self.get_birdeye_tokens(),
+            self.get_jupiter_new_tokens()
+        ]
         if HELIUS_API_KEY:
-            tokens.extend(await self.get_helius_tokens())
-            
-        # Always try free sources
-        tokens.extend(await self.get_dexscreener_tokens())
-        tokens.extend(await self.get_birdeye_tokens())
-        tokens.extend(await self.get_jupiter_new_tokens())
+            sources.append(self.get_helius_tokens())
+            
+        # Sources overlap heavily, so merge by address keeping the record
+        # with the most liquidity
+        merged = {}
+        total = 0
+        for source_tokens in await asyncio.gather(*sources, return_exceptions=True):
+            if isinstance(source_tokens, Exception):
+                logger.error(f"Token source error: {source_tokens}")
+                continue
+            total += len(source_tokens)
+            for token in source_tokens:
+                # Validate address format
+                address = token.get('address', '')
+                if not _is_valid_address(address):
+                    logger.debug(f"Skipping invalid address: {address}")
+                    continue
+                existing = merged.get(address)
+                if existing is None or token.get('liquidity', 0) > existing.get('liquidity', 0):
+                    merged[address] = token
         
-        logger.info(f"Total tokens found before filtering: {len(tokens)}")
+        logger.info(f"Total tokens found before filtering: {total} ({len(merged)} unique)")
         
         # Filter and validate tokens
         validated_tokens = []
         
-        for token in tokens:
-            # Validate address format
-            address = token.get('address', '')
-            if not re.match(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$', address):
-                logger.debug(f"Skipping invalid address: {address}")
-                continue
-                
+        for address, token in merged.items():
             if address not in self.checked_tokens:
                 # Validate token has required fields
-                if all(token.get(field) for field in ['address', 'symbol', 'liquidity']):
+                if token.get('symbol') and token.get('liquidity'):
                     self.checked_tokens.add(address)
+                    bot_state.tokens_checked += 1
                     validated_tokens.append(token)
                     logger.debug(f"Valid token found: {token['symbol']} ({address[:8]}...) - Liq: {token['liquidity']:.1f} SOL")
                 
-        bot_state.tokens_checked = len(self.checked_tokens)
         logger.info(f"New validated tokens: {len(validated_tokens)}")
         
         return validated_tokens
@@ -1362,19 +1119,23 @@ class TokenDiscovery:
             
             async with session.get(list_url, timeout=10) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    tokens = []
+                    data = await read_json(response)
                     
-                    for token_data in data[:20]:  # Process top 20
-                        try:
-                            address = token_data.get('mint', token_data.get('address', ''))
-                            if address:
-                                # Get token details
-                                token_info = await self._get_token_details(address)
-                                if token_info:
-                                    tokens.append(token_info)
-                        except:
-                            continue
+                    # Process top 20
+                    addresses = [
+                        address for address in (
+                            token_data.get('mint', token_data.get('address', ''))
+                            for token_data in data[:20]
+                        ) if address
+                    ]
+                    
+                    # One token-metadata POST primes the price cache for the
+                    # whole batch; misses go straight to the other providers
+                    await self.price_checker.get_prices_batch(addresses)
+                    details = await asyncio.gather(
+                        *(self._get_token_details(address) for address in addresses)
+                    )
+                    tokens = [token_info for token_info in details if token_info]
                             
                     logger.info(f"Found {len(tokens)} tokens from Helius")
                     return tokens
@@ -1395,13 +1156,16 @@ class TokenDiscovery:
             
             async with session.get(url, timeout=10) as response:
                 if response.status == 200:
-                    all_token_addresses = await response.json()
+                    all_token_addresses = await read_json(response)
                     
-                    # Now get prices for newest tokens (check ones we haven't seen)
+                    # Now get prices for newest tokens (check ones we haven't seen);
+                    # only 30 are priced, so stop scanning once we have them
                     new_addresses = []
                     for address in all_token_addresses:
-                        if address not in self.checked_tokens and len(new_addresses) < 50:
+                        if address not in self.checked_tokens:
                             new_addresses.append(address)
+                            if len(new_addresses) >= 30:
+                                break
                     
                     if not new_addresses:
                         return []
@@ -1409,13 +1173,13 @@ class TokenDiscovery:
                     # Get token info and prices
                     price_url = "https://api.jup.ag/price/v2"
                     params = {
-                        "ids": ",".join(new_addresses[:30]),  # Limit to 30 tokens
+                        "ids": ",".join(new_addresses),  # At most 30 tokens
                         "showExtraInfo": "true"
                     }
                     
                     async with session.get(price_url, params=params, timeout=10) as price_response:
                         if price_response.status == 200:
-                            price_data = await price_response.json()
+                            price_data = await read_json(price_response)
                             tokens = []
                             
                             for address, token_info in price_data.get('data', {}).items():
@@ -1463,39 +1227,41 @@ class TokenDiscovery:
             
             async with session.get(url, timeout=10) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await read_json(response)
                     tokens = []
+                    now_ms = time.time() * 1000  # pairCreatedAt is epoch ms
                     
-                    for pair in data.get('pairs', [])[:30]:
+                    for pair in (data.get('pairs') or ())[:30]:
                         # Validate token address
-                        base_token = pair.get('baseToken', {})
+                        base_token = pair.get('baseToken') or _EMPTY
                         token_address = base_token.get('address', '')
                         
                         # Skip if invalid address format
                         if not token_address or len(token_address) < 32:
                             continue
                             
+                        liquidity = (pair.get('liquidity') or _EMPTY).get('usd', 0) * SOL_PER_USD  # Convert to SOL
+                        if liquidity <= 0:
+                            continue
+                            
                         # Calculate age in minutes
                         created_at = pair.get('pairCreatedAt', 0)
                         if created_at:
-                            age_minutes = (time.time() * 1000 - created_at) / 60000
+                            age_minutes = (now_ms - created_at) / 60000
                         else:
                             age_minutes = 60  # Default 1 hour
                             
-                        token = {
+                        tokens.append({
                             'address': token_address,
                             'symbol': base_token.get('symbol', 'UNKNOWN'),
                             'name': base_token.get('name', ''),
-                            'liquidity': pair.get('liquidity', {}).get('usd', 0) / 40,  # Convert to SOL
+                            'liquidity': liquidity,
                             'age_minutes': int(age_minutes),
-                            'volume_24h': pair.get('volume', {}).get('h24', 0),
+                            'volume_24h': (pair.get('volume') or _EMPTY).get('h24', 0),
                             'price_usd': pair.get('priceUsd', 0),
                             'holders': 0,  # Will check separately
                             'source': 'dexscreener'
-                        }
-                        
-                        if token['address'] and token['liquidity'] > 0:
-                            tokens.append(token)
+                        })
                             
                     logger.info(f"Found {len(tokens)} tokens from DexScreener")
                     return tokens
@@ -1517,42 +1283,41 @@ class TokenDiscovery:
                 "https://public-api.birdeye.so/public/tokenlist?sort_by=mc&sort_type=asc&offset=0&limit=50"
             ]
             
-            all_tokens = []
+            # The endpoints are independent, so fetch them concurrently
+            pages = await asyncio.gather(
+                *(self._fetch_birdeye_page(session, url) for url in endpoints),
+                return_exceptions=True
+            )
             
-            for url in endpoints:
-                try:
-                    async with session.get(url, timeout=10) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            
-                            if data.get('success') and 'data' in data:
-                                tokens_data = data.get('data', {}).get('tokens', [])
-                                for token_data in tokens_data[:20]:
-                                    # Only include tokens with reasonable metrics
-                                    if token_data.get('v24hUSD', 0) > 100:  # Min $100 daily volume
-                                        token = {
-                                            'address': token_data.get('address', ''),
-                                            'symbol': token_data.get('symbol', 'UNKNOWN'),
-                                            'name': token_data.get('name', ''),
-                                            'liquidity': token_data.get('liquidity', 0) / 1e9,  # Convert to SOL
-                                            'age_minutes': 60,  # Default estimate
-                                            'volume_24h': token_data.get('v24hUSD', 0),
-                                            'price_usd': token_data.get('v24hUSD', 0) / max(token_data.get('v24hTx', 1), 1),
-                                            'holders': token_data.get('holder', 0),
-                                            'source': 'birdeye'
-                                        }
-                                        
-                                        if token.get('address'):
-                                            all_tokens.append(token)
-                except:
+            # The lists overlap, so skip addresses already taken from another
+            tokens = []
+            seen = set()
+            
+            for tokens_data in pages:
+                if isinstance(tokens_data, Exception):
+                    logger.debug(f"Birdeye list error: {tokens_data}")
                     continue
                     
-            # Remove duplicates
-            unique_tokens = {}
-            for token in all_tokens:
-                unique_tokens[token['address']] = token
-                
-            tokens = list(unique_tokens.values())
+                for token_data in tokens_data[:20]:
+                    address = token_data.get('address', '')
+                    if not address or address in seen:
+                        continue
+                        
+                    # Only include tokens with reasonable metrics
+                    if token_data.get('v24hUSD', 0) > 100:  # Min $100 daily volume
+                        seen.add(address)
+                        tokens.append({
+                            'address': address,
+                            'symbol': token_data.get('symbol', 'UNKNOWN'),
+                            'name': token_data.get('name', ''),
+                            'liquidity': token_data.get('liquidity', 0) / 1e9,  # Convert to SOL
+                            'age_minutes': 60,  # Default estimate
+                            'volume_24h': token_data.get('v24hUSD', 0),
+                            'price_usd': token_data.get('v24hUSD', 0) / max(token_data.get('v24hTx', 1), 1),
+                            'holders': token_data.get('holder', 0),
+                            'source': 'birdeye'
+                        })
+                        
             logger.info(f"Found {len(tokens)} tokens from Birdeye")
             return tokens
             
@@ -1561,6 +1326,16 @@ class TokenDiscovery:
             
         return []
         
+    async def _fetch_birdeye_page(self, session: aiohttp.ClientSession, url: str) -> List[Dict]:
+        """Fetch one Birdeye token list page"""
+        async with session.get(url, timeout=10) as response:
+            if response.status == 200:
+                data = await read_json(response)
+                if data.get('success'):
+                    # Birdeye sends null rather than an empty list at times
+                    return (data.get('data') or _EMPTY).get('tokens') or []
+        return []
+        
     async def _get_token_details(self, address: str) -> Optional[Dict]:
         """Get detailed token information"""
         try:
@@ -1575,12 +1350,12 @@ class TokenDiscovery:
                     'liquidity': 10,  # Will be checked separately
                     'age_minutes': 30,
                     'volume_24h': 1000,
-                    'price_usd': price * 40,  # Convert to USD
+                    'price_usd': price * SOL_USD_FALLBACK,  # Convert to USD
                     'holders': 50,
                     'source': 'helius'
                 }
-        except:
-            pass
+        except Exception as e:
+            logger.debug(f"Token details error for {address}: {e}")
             
         return None
 
@@ -1614,10 +1389,23 @@ class RiskManager:
         self.max_position_size = MAX_POSITION_SIZE
         self.min_wallet_balance = MIN_WALLET_BALANCE
         self.cooldown_period = RISK_SETTINGS['cooldown_after_loss']
+        self.cooldown_period_ns = self.cooldown_period * NS_PER_SEC
         
     def can_trade(self) -> Tuple[bool, str]:
         """Check if we can place a new trade"""
         
+        # Plain attribute checks first; the clock is only read if they pass
+        
+        # Check max positions
+        if len(bot_state.active_positions) >= MAX_POSITIONS:
+            bot_state.risk_status = "Max positions reached"
+            return False, "Maximum positions reached"
+            
+        # Check wallet balance
+        if bot_state.wallet_balance < self.min_wallet_balance:
+            bot_state.risk_status = "Insufficient balance"
+            return False, "Insufficient wallet balance"
+            
         # Check daily loss limit
         if bot_state.daily_loss >= self.daily_loss_limit:
             bot_state.risk_status = "Daily loss limit reached"
@@ -1625,28 +1413,18 @@ class RiskManager:
             
         # Check if in cooldown after loss
         if bot_state.last_loss_time > 0:
-            time_since_loss = time.time() - bot_state.last_loss_time
-            if time_since_loss < self.cooldown_period:
-                remaining = int(self.cooldown_period - time_since_loss)
+            time_since_loss = time.monotonic_ns() - bot_state.last_loss_time
+            if time_since_loss < self.cooldown_period_ns:
+                remaining = (self.cooldown_period_ns - time_since_loss) // NS_PER_SEC
                 bot_state.risk_status = f"Cooldown: {remaining}s remaining"
                 return False, f"In cooldown for {remaining} seconds"
             
-        # Check wallet balance
-        if bot_state.wallet_balance < self.min_wallet_balance:
-            bot_state.risk_status = "Insufficient balance"
-            return False, "Insufficient wallet balance"
-            
-        # Check max positions
-        if len(bot_state.active_positions) >= MAX_POSITIONS:
-            bot_state.risk_status = "Max positions reached"
-            return False, "Maximum positions reached"
-            
         bot_state.risk_status = "Normal - Can trade"
         return True, "OK"
         
-    def calculate_position_size(self, personality: Dict) -> float:
+    def calculate_position_size(self, personality: Personality) -> float:
         """Calculate safe position size"""
-        base_size = personality['position_size']
+        base_size = personality.position_size
         
         # Reduce size based on recent losses
         if bot_state.daily_loss > 0:
@@ -1661,7 +1439,7 @@ class RiskManager:
         """Record trade result for risk management"""
         if profit < 0:
             bot_state.daily_loss += abs(profit)
-            bot_state.last_loss_time = time.time()
+            bot_state.last_loss_time = time.monotonic_ns()
             bot_state.losing_trades += 1
         else:
             bot_state.winning_trades += 1
@@ -1669,6 +1447,19 @@ class RiskManager:
         bot_state.total_trades += 1
         bot_state.total_profit += profit
 
+def _read_session() -> Optional[str]:
+    """Read the saved Telethon session string, None if there is no file (blocking; run in a thread)"""
+    if not os.path.exists(SESSION_PATH):
+        return None
+    with open(SESSION_PATH, 'r') as f:
+        return f.read().strip()
+
+def _write_session(session_string: str):
+    """Persist the Telethon session string (blocking; run in a thread)"""
+    os.makedirs(os.path.dirname(SESSION_PATH), exist_ok=True)
+    with open(SESSION_PATH, 'w') as f:
+        f.write(session_string)
+
 class LiveTradingBot:
     """Live trading bot with safety measures"""
     
@@ -1688,13 +1479,78 @@ class LiveTradingBot:
         self.monitoring_tokens = {}  # Initialize here
         
     async def setup_telegram(self, api_id: str, api_hash: str):
-        """Save Telegram credentials"""
+        """Save Telegram credentials, resuming a saved session if there is one"""
         self.api_id = api_id
         self.api_hash = api_hash
         bot_state.configured = True
         logger.info("Telegram credentials saved")
+        if not bot_state.authenticated:
+            await self.try_resume_session()
         return True
         
+    async def try_resume_session(self) -> bool:
+        """Log in with the saved session, skipping the code/verify exchange"""
+        if not TELEGRAM_AVAILABLE:
+            return False
+            
+        client = None
+        try:
+            # Keep disk I/O off the event loop
+            session_string = await asyncio.to_thread(_read_session)
+            if session_string is None:
+                logger.info("No existing session found - please use dashboard to authenticate")
+                return False
+            logger.info(f"Found session file at {SESSION_PATH}")
+            if not session_string:
+                return False
+                
+            logger.info("Attempting to load existing session...")
+            TelegramClient, StringSession = _load_telethon()
+            client = TelegramClient(
+                StringSession(session_string),
+                int(self.api_id),
+                self.api_hash
+            )
+            await client.connect()
+            
+            if not await client.is_user_authorized():
+                logger.warning("Session expired, need to re-authenticate")
+                await client.disconnect()
+                # Remove invalid session
+                await asyncio.to_thread(os.remove, SESSION_PATH)
+                return False
+                
+            logger.info("Session loaded successfully!")
+            self.client = client
+            await self._start_trading()
+            bot_state.configured = True
+            bot_state.authenticated = True
+            logger.info("Bot fully started with existing session!")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to load session: {e}")
+            logger.info("Session error - please use dashboard to authenticate")
+            # Leave nothing half-started so a later setup can retry cleanly
+            bot_state.authenticated = False
+            if client is not None:
+                if self.client is client:
+                    self.client = None
+                try:
+                    await client.disconnect()
+                except Exception as exc:
+                    logger.debug(f"Telegram disconnect error: {exc}")
+            return False
+            
+    async def _start_trading(self):
+        """Find ToxiBot and start the background tasks"""
+        await self.find_toxibot()
+        self.running = True
+        bot_state.running = True
+        asyncio.create_task(self.trading_loop())
+        asyncio.create_task(self.monitor_toxibot_messages())
+        asyncio.create_task(self.monitor_positions())
+        
     async def send_code(self, phone: str):
         """Send verification code"""
         if not TELEGRAM_AVAILABLE:
@@ -1702,6 +1558,7 @@ class LiveTradingBot:
             
         try:
             # Create new client
+            TelegramClient, StringSession = _load_telethon()
             self.client = TelegramClient(
                 StringSession(), 
                 int(self.api_id), 
@@ -1738,23 +1595,12 @@ class LiveTradingBot:
                 phone_code_hash=self.code_hash
             )
             
-            # Save session
-            session_string = self.client.session.save()
-            os.makedirs('data', exist_ok=True)
-            with open('data/session.txt', 'w') as f:
-                f.write(session_string)
-                
-            bot_state.authenticated = True
-            
-            # Find ToxiBot
-            await self.find_toxibot()
+            # Save session without blocking the event loop on disk I/O
+            await asyncio.to_thread(_write_session, self.client.session.save())
             
-            # Start trading
-            self.running = True
-            bot_state.running = True
-            asyncio.create_task(self.trading_loop())
-            asyncio.create_task(self.monitor_toxibot_messages())
-            asyncio.create_task(self.monitor_positions())
+            # Find ToxiBot and start trading
+            await self._start_trading()
+            bot_state.authenticated = True
             
             logger.info("Bot started successfully!")
             return True
@@ -1765,8 +1611,29 @@ class LiveTradingBot:
             
     async def find_toxibot(self):
         """Find ToxiBot in Telegram chats"""
-        # Implementation continues...
-        pass
+        try:
+            # Resolving the known handle is a single API call
+            self.toxibot_chat = await self.client.get_entity(TOXIBOT_USERNAME)
+        except Exception as e:
+            logger.debug(f"Could not resolve @{TOXIBOT_USERNAME}: {e}")
+            # Fall back to scanning dialogs for the exact bot handle; a
+            # display name match could be any chat that mentions ToxiBot
+            wanted = TOXIBOT_USERNAME.lstrip('@').lower()
+            try:
+                async for dialog in self.client.iter_dialogs():
+                    username = getattr(dialog.entity, 'username', None) or ''
+                    if username.lower() == wanted:
+                        self.toxibot_chat = dialog.entity
+                        break
+            except Exception as e:
+                logger.warning(f"Could not scan Telegram dialogs for ToxiBot: {e}")
+                    
+        bot_state.toxibot_connected = self.toxibot_chat is not None
+        if bot_state.toxibot_connected:
+            logger.info("ToxiBot found")
+        else:
+            logger.warning(f"ToxiBot not found - start a chat with @{TOXIBOT_USERNAME} first")
+        return bot_state.toxibot_connected
         
     async def execute_buy(self, token_address: str, amount_sol: float = POSITION_SIZE):
         """Execute buy order through ToxiBot"""
@@ -1797,7 +1664,7 @@ class LiveTradingBot:
         """Parse trade result from ToxiBot message"""
         try:
             # Extract token address and profit/loss amount
-            sol_match = re.search(r'(\d+\.?\d*)\s*SOL', message)
+            sol_match = _SOL_AMOUNT_RE.search(message)
             if sol_match:
                 amount = float(sol_match.group(1))
                 if is_loss:
@@ -1823,8 +1690,31 @@ class WebServer:
     
     def __init__(self):
         self.app = web.Application()
+        self._load_dashboard()
+        self._stats_body = b''
+        self._status_key = None
+        self._status_body = b''
+        self._stats_changed = asyncio.Condition()
+        self._stats_task = None
+        self._streams_closing = False
+        self.app.on_startup.append(self._start_stats_broadcast)
+        self.app.on_shutdown.append(self._end_stats_streams)
+        self.app.on_cleanup.append(self._stop_stats_broadcast)
+        self.app.on_cleanup.append(self._close_http_session)
         self.setup_routes()
         
+    def _load_dashboard(self):
+        """Read the dashboard bytes once and keep a gzip copy for capable clients"""
+        with open(DASHBOARD_PATH, 'rb') as f:
+            self._dash_body = f.read()
+        self._dash_gzip = gzip.compress(self._dash_body, compresslevel=9)
+        self._dash_etag = hashlib.md5(self._dash_body, usedforsecurity=False).hexdigest()
+        self._dash_headers = {
+            'ETag': f'"{self._dash_etag}"',
+            'Cache-Control': 'public, max-age=3600',
+            'Vary': 'Accept-Encoding',
+        }
+        
     def setup_routes(self):
         self.app.router.add_get('/', self.index)
         self.app.router.add_get('/api/status', self.status)
@@ -1832,70 +1722,95 @@ class WebServer:
         self.app.router.add_post('/api/request-code', self.request_code)
         self.app.router.add_post('/api/verify-code', self.verify_code)
         self.app.router.add_get('/api/stats', self.stats)
+        self.app.router.add_get('/api/stats/stream', self.stats_stream)
         
     async def index(self, request):
-        return web.Response(text=DASHBOARD_HTML, content_type='text/html')
+        # Weak comparison, so proxies that rewrite the tag as W/"..." when
+        # compressing still get a 304
+        for etag in request.if_none_match or ():
+            if etag.value in (self._dash_etag, '*'):
+                return web.Response(status=304, headers=self._dash_headers)
+            
+        if _accepts_gzip(request.headers.get('Accept-Encoding', '')):
+            return web.Response(
+                body=self._dash_gzip,
+                content_type='text/html',
+                charset='utf-8',
+                headers={**self._dash_headers, 'Content-Encoding': 'gzip'}
+            )
+            
+        return web.Response(
+            body=self._dash_body,
+            content_type='text/html',
+            charset='utf-8',
+            headers=self._dash_headers
+        )
         
     async def status(self, request):
-        return web.json_response({
-            'configured': bot_state.configured,
-            'authenticated': bot_state.authenticated,
-            'running': bot_state.running,
-            'hasHeliusKey': bool(HELIUS_API_KEY)
-        })
+        # Re-encode only when one of the flags actually changed
+        key = (bot_state.configured, bot_state.authenticated, bot_state.running)
+        if key != self._status_key:
+            self._status_key = key
+            self._status_body = json_dumps({
+                'configured': bot_state.configured,
+                'authenticated': bot_state.authenticated,
+                'running': bot_state.running,
+                'hasHeliusKey': bool(HELIUS_API_KEY)
+            })
+        return web.Response(body=self._status_body, content_type='application/json')
         
     async def setup(self, request):
         try:
-            data = await request.json()
+            data = await request.json(loads=json_loads)
             api_id = data.get('api_id')
             api_hash = data.get('api_hash')
             
             if not api_id or not api_hash:
-                return web.json_response({'error': 'Missing credentials'}, status=400)
+                return json_response({'error': 'Missing credentials'}, status=400)
                 
             await trading_bot.setup_telegram(api_id, api_hash)
             
-            return web.json_response({'status': 'success'})
+            return json_response({'status': 'success', 'authenticated': bot_state.authenticated})
         except Exception as e:
             logger.error(f"Setup error: {e}")
-            return web.json_response({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
             
     async def request_code(self, request):
         try:
-            data = await request.json()
+            data = await request.json(loads=json_loads)
             phone = data.get('phone')
             
             if not phone:
-                return web.json_response({'error': 'Phone number required'}, status=400)
+                return json_response({'error': 'Phone number required'}, status=400)
                 
             await trading_bot.send_code(phone)
             
-            return web.json_response({'status': 'success'})
+            return json_response({'status': 'success'})
         except Exception as e:
             logger.error(f"Request code error: {e}")
-            return web.json_response({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
             
     async def verify_code(self, request):
         try:
-            data = await request.json()
+            data = await request.json(loads=json_loads)
             code = data.get('code')
             
             if not code:
-                return web.json_response({'error': 'Code required'}, status=400)
+                return json_response({'error': 'Code required'}, status=400)
                 
             await trading_bot.verify_code(code)
             
-            return web.json_response({'status': 'success'})
+            return json_response({'status': 'success'})
         except Exception as e:
             logger.error(f"Verify code error: {e}")
-            return web.json_response({'error': str(e)}, status=400)
+            return json_response({'error': str(e)}, status=400)
             
-    async def stats(self, request):
+    def _stats_payload(self) -> Dict:
         win_rate = 0
         if bot_state.total_trades > 0:
             win_rate = int((bot_state.winning_trades / bot_state.total_trades) * 100)
             
-        return web.json_response({
+        return {
             'profit': bot_state.total_profit,
             'trades': bot_state.active_trades,
             'winRate': win_rate,
@@ -1905,124 +1820,104 @@ class WebServer:
             'activityType': bot_state.last_activity_type,
             'walletBalance': bot_state.wallet_balance,
             'riskStatus': bot_state.risk_status
+        }
+        
+    async def stats(self, request):
+        # The broadcaster re-encodes stats every STATS_PUSH_INTERVAL; reuse it
+        if self._stats_body:
+            return web.Response(body=self._stats_body, content_type='application/json')
+        return json_response(self._stats_payload())
+        
+    async def _start_stats_broadcast(self, app):
+        self._stats_task = asyncio.create_task(self._broadcast_stats())
+        
+    async def _stop_stats_broadcast(self, app):
+        if self._stats_task:
+            self._stats_task.cancel()
+            
+    async def _end_stats_streams(self, app):
+        """Let open SSE streams return so shutdown doesn't wait on them"""
+        self._streams_closing = True
+        async with self._stats_changed:
+            self._stats_changed.notify_all()
+            
+    async def _close_http_session(self, app):
+        """Release the pooled API connections with the web app"""
+        await close_session()
+            
+    async def _broadcast_stats(self):
+        """Serialize stats once per tick and wake stream subscribers when they change"""
+        while True:
+            body = json_dumps(self._stats_payload())
+            if body != self._stats_body:
+                self._stats_body = body
+                async with self._stats_changed:
+                    self._stats_changed.notify_all()
+            await asyncio.sleep(STATS_PUSH_INTERVAL)
+            
+    async def stats_stream(self, request):
+        """Push stats to the dashboard over Server-Sent Events"""
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
         })
-
-async def load_existing_session():
-    """Load existing Telegram session if available"""
-    try:
-        session_path = 'data/session.txt'
-        if os.path.exists(session_path):
-            logger.info(f"Found session file at {session_path}")
-            with open(session_path, 'r') as f:
-                session_string = f.read().strip()
-                
-            if session_string and TELEGRAM_AVAILABLE:
-                logger.info("Attempting to load existing session...")
-                # Get API credentials from environment
-                api_id = TELEGRAM_API_ID or os.environ.get('TG_API_ID')
-                api_hash = TELEGRAM_API_HASH or os.environ.get('TG_API_HASH')
-                
-                if not api_id or not api_hash:
-                    logger.warning("No Telegram API credentials in environment")
-                    return False
-                
-                # Try to connect with existing session
-                client = TelegramClient(StringSession(session_string), 
-                                      int(api_id), 
-                                      api_hash)
-                                      
-                await client.connect()
+        await response.prepare(request)
+        
+        try:
+            sent = self._stats_body or json_dumps(self._stats_payload())
+            await response.write(b'data: ' + sent + b'\n\n')
+            
+            # Compare against the body last written rather than relying on
+            # the notify alone, which is missed while a write is in progress
+            def changed():
+                return self._streams_closing or (self._stats_body and self._stats_body != sent)
                 
-                if await client.is_user_authorized():
-                    logger.info("Session loaded successfully!")
-                    trading_bot.client = client
-                    trading_bot.api_id = api_id
-                    trading_bot.api_hash = api_hash
-                    bot_state.configured = True
-                    bot_state.authenticated = True
-                    
-                    # Find ToxiBot and start
-                    await trading_bot.find_toxibot()
-                    trading_bot.running = True
-                    bot_state.running = True
-                    
-                    # Start all background tasks
-                    asyncio.create_task(trading_bot.trading_loop())
-                    asyncio.create_task(trading_bot.monitor_toxibot_messages())
-                    asyncio.create_task(trading_bot.monitor_positions())
-                    
-                    logger.info("Bot fully started with existing session!")
-                    return True
-                else:
-                    logger.warning("Session expired, need to re-authenticate")
-                    await client.disconnect()
-                    # Remove invalid session
-                    os.remove(session_path)
-        else:
-            logger.info("No existing session found - please use dashboard to authenticate")
+            while not self._streams_closing:
+                try:
+                    async with self._stats_changed:
+                        await asyncio.wait_for(self._stats_changed.wait_for(changed), STATS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    await response.write(b': keep-alive\n\n')
+                    continue
                     
-    except Exception as e:
-        logger.error(f"Failed to load session: {e}")
-        logger.info("Session error - please use dashboard to authenticate")
+                if self._streams_closing:
+                    break
+                sent = self._stats_body
+                await response.write(b'data: ' + sent + b'\n\n')
+                
+        except ConnectionResetError:
+            pass
+            
+        return response
+
 async def load_existing_session():
-       
     """Load existing Telegram session if available"""
-    try:
-        session_path = 'data/session.txt'
-        if os.path.exists(session_path):
-            logger.info(f"Found session file at {session_path}")
-            with open(session_path, 'r') as f:
-                session_string = f.read().strip()
-                
-            if session_string and TELEGRAM_AVAILABLE:
-                logger.info("Attempting to load existing session...")
-                # Get API credentials from environment
-                api_id = TELEGRAM_API_ID or os.environ.get('TG_API_ID')
-                api_hash = TELEGRAM_API_HASH or os.environ.get('TG_API_HASH')
-                
-                if not api_id or not api_hash:
-                    logger.warning("No Telegram API credentials in environment")
-                    return False
-                
-                # Try to connect with existing session
-                client = TelegramClient(StringSession(session_string), 
-                                      int(api_id), 
-                                      api_hash)
-                                      
-                await client.connect()
-                
-                if await client.is_user_authorized():
-                    logger.info("Session loaded successfully!")
-                    trading_bot.client = client
-                    trading_bot.api_id = api_id
-                    trading_bot.api_hash = api_hash
-                    bot_state.configured = True
-                    bot_state.authenticated = True
-                    
-                    # Find ToxiBot and start
-                    await trading_bot.find_toxibot()
-                    trading_bot.running = True
-                    bot_state.running = True
-                    
-                    # Start all background tasks
-                    asyncio.create_task(trading_bot.trading_loop())
-                    asyncio.create_task(trading_bot.monitor_toxibot_messages())
-                    asyncio.create_task(trading_bot.monitor_positions())
-                    
-                    logger.info("Bot fully started with existing session!")
-                    return True
-                else:
-                    logger.warning("Session expired, need to re-authenticate")
-                    await client.disconnect()
-                    # Remove invalid session
-                    os.remove(session_path)
-        else:
-            logger.info("No existing session found")
-                    
-    except Exception as e:
-        logger.error(f"Failed to load session: {e}")
-        
-    return False
+    if not TELEGRAM_API_ID or not TELEGRAM_API_HASH:
+        logger.warning("No Telegram API credentials in environment")
+        return False
+        
+    # Only a resumed session marks the bot configured; otherwise the
+    # dashboard still walks the user through setup
+    trading_bot.api_id = TELEGRAM_API_ID
+    trading_bot.api_hash = TELEGRAM_API_HASH
+    return await trading_bot.try_resume_session()
+
+_BANNER = """
+    ╔═══════════════════════════════════════╗
+    ║    SOLANA SAFE TRADING BOT V2.0       ║
+    ╠═══════════════════════════════════════╣
+    ║                                       ║
+    ║  Dashboard: http://localhost:{port}    ║
+    ║                                       ║
+    ║  Status: {status}                  ║
+    ║                                       ║
+    ╚═══════════════════════════════════════╝
+    
+    Bot is running on port {port}
+    
+    {footer}
+    """
 
 async def main():
     """Start the bot"""
@@ -2050,29 +1945,32 @@ async def main():
     site = web.TCPSite(runner, '0.0.0.0', port)
     await site.start()
     
-    print(f"""
-    ╔═══════════════════════════════════════╗
-    ║    SOLANA SAFE TRADING BOT V2.0       ║
-    ╠═══════════════════════════════════════╣
-    ║                                       ║
-    ║  Dashboard: http://localhost:{port}    ║
-    ║                                       ║
-    ║  Status: {'Authenticated' if bot_state.authenticated else 'Need Authentication'}                  ║
-    ║                                       ║
-    ╚═══════════════════════════════════════╝
-    
-    Bot is running on port {port}
-    
-    {'✓ Bot authenticated and trading!' if bot_state.authenticated else '→ Please visit the dashboard to authenticate with Telegram'}
-    """)
+    if bot_state.authenticated:
+        status, footer = 'Authenticated', '✓ Bot authenticated and trading!'
+    else:
+        status, footer = 'Need Authentication', '→ Please visit the dashboard to authenticate with Telegram'
+    print(_BANNER.format(port=port, status=status, footer=footer))
     
-    # Keep running
+    # Keep running until SIGINT/SIGTERM
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C cancels the task instead
+            
     try:
-        while True:
-            await asyncio.sleep(3600)
-    except KeyboardInterrupt:
+        await stop.wait()
+    finally:
         logger.info("Shutting down safely...")
         trading_bot.running = False
         if trading_bot.client:
             await trading_bot.client.disconnect()
         await runner.cleanup()
+
+if __name__ == '__main__':
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    asyncio.run(main())
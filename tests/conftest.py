@@ -0,0 +1,8 @@
+import os
+import sys
+
+# main.py refuses to import without Telegram credentials
+os.environ.setdefault('TG_API_ID', '12345')
+os.environ.setdefault('TG_API_HASH', 'test-hash')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,393 @@
+import asyncio
+
+import main
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(main.time, 'monotonic_ns', clock)
+    cache = main.TTLCache(maxsize=4, ttl_ns=10)
+    cache['a'] = 1
+    clock.now = 9
+    assert cache.get('a') == 1
+    clock.now = 10
+    assert 'a' not in cache
+    assert cache.get('a', 'gone') == 'gone'
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = main.TTLCache(maxsize=2)
+    cache['a'] = 1
+    cache.add('b')
+    assert cache.get('a') == 1  # 'a' is now the most recent
+    cache['c'] = 3
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def _run_with(checker, rugcheck, holders, metadata):
+    async def fake(value):
+        return value
+    checker._check_rugcheck = lambda _addr: fake(rugcheck)
+    checker._check_holder_distribution = lambda _addr: fake(holders)
+    checker._check_token_metadata = lambda _addr: fake(metadata)
+    return asyncio.run(checker._run_safety_check('Mint1111111111111111111111111111111111111111'))
+
+
+UNSCORED_HOLDERS = {'holder_count': 0, 'top_holder_percentage': 0, 'warnings': []}
+CLEAN_METADATA = {'risk_score': 0, 'warnings': []}
+TOO_NEW = main.ContractChecker._rugcheck_too_new()
+
+
+def test_safety_fails_closed_when_rugcheck_down_and_holders_unscored():
+    result = _run_with(main.ContractChecker(), None, UNSCORED_HOLDERS, CLEAN_METADATA)
+    assert result.is_safe is False
+    assert result.risk_score == 8
+
+
+def test_safety_fails_closed_when_token_too_new_and_holders_unscored():
+    result = _run_with(main.ContractChecker(), TOO_NEW, UNSCORED_HOLDERS, CLEAN_METADATA)
+    assert result.is_safe is False
+    assert result.risk_score == 8
+
+
+def test_safety_fails_closed_when_no_source_answers():
+    result = _run_with(main.ContractChecker(), None, None, None)
+    assert result.is_safe is False
+    assert result.risk_score == 8
+
+
+def test_safety_takes_worst_secondary_score():
+    holders = {'risk_score': 6, 'warnings': ['Top holder owns 40%']}
+    result = _run_with(main.ContractChecker(), TOO_NEW, holders, CLEAN_METADATA)
+    assert result.is_safe is True
+    assert result.risk_score == 6
+    assert 'Top holder owns 40%' in result.warnings
+
+
+def test_unverified_result_is_not_cached():
+    checker = main.ContractChecker()
+    _run_with(checker, None, UNSCORED_HOLDERS, CLEAN_METADATA)
+    assert 'Mint1111111111111111111111111111111111111111' not in checker.checked_contracts
+
+
+def test_stats_streams_end_on_shutdown():
+    from aiohttp.test_utils import TestClient, TestServer
+
+    async def scenario():
+        server = main.WebServer()
+        async with TestClient(TestServer(server.app)) as client:
+            response = await client.get('/api/stats/stream')
+            assert (await response.content.readline()).startswith(b'data: ')
+            await server._end_stats_streams(server.app)
+            await asyncio.wait_for(response.content.read(), 2)
+
+    asyncio.run(scenario())
+
+
+class _FakeResponse:
+    def __init__(self, body):
+        self.status = 200
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.posts = 0
+
+    def _respond(self, url):
+        return _FakeResponse(self.body(url) if callable(self.body) else self.body)
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        return self._respond(url)
+
+    def get(self, url, **kwargs):
+        return self._respond(url)
+
+
+def test_helius_batch_misses_skip_helius_on_fallback():
+    checker = main.PriceChecker()
+    session = _FakeSession(main.json_dumps([
+        {'account': 'Priced', 'priceInfo': {'pricePerToken': 0.5}},
+        {'account': 'Unpriced', 'priceInfo': None},
+    ]))
+    fallback_calls = []
+
+    async def get_session():
+        return session
+
+    async def dexscreener(address):
+        fallback_calls.append(address)
+        return 0.25
+
+    async def no_price(address):
+        return None
+
+    checker.get_session = get_session
+    checker._price_sources['dexscreener'] = dexscreener
+    checker._price_sources['birdeye'] = no_price
+
+    async def scenario():
+        await checker.get_prices_batch(['Priced', 'Unpriced'])
+        return await checker.get_token_price('Priced'), await checker.get_token_price('Unpriced')
+
+    assert asyncio.run(scenario()) == (0.5, 0.25)
+    assert session.posts == 1
+    assert fallback_calls == ['Unpriced']
+
+
+class _Entity:
+    def __init__(self, username):
+        self.username = username
+
+
+class _Dialog:
+    def __init__(self, name, username):
+        self.name = name
+        self.entity = _Entity(username)
+
+
+class _FakeTelegram:
+    def __init__(self, dialogs=None, dialogs_error=None):
+        self.dialogs = dialogs or []
+        self.dialogs_error = dialogs_error
+
+    async def get_entity(self, username):
+        raise ValueError('cannot resolve')
+
+    async def iter_dialogs(self):
+        if self.dialogs_error:
+            raise self.dialogs_error
+        for dialog in self.dialogs:
+            yield dialog
+
+
+def test_find_toxibot_matches_exact_username_only():
+    bot = main.LiveTradingBot()
+    bot.client = _FakeTelegram([
+        _Dialog('Toxi Traders', 'toxi_traders'),
+        _Dialog('ToxiBot', main.TOXIBOT_USERNAME.upper()),
+    ])
+    assert asyncio.run(bot.find_toxibot()) is True
+    assert bot.toxibot_chat.username == main.TOXIBOT_USERNAME.upper()
+
+
+def test_find_toxibot_survives_dialog_scan_failure():
+    bot = main.LiveTradingBot()
+    bot.client = _FakeTelegram(dialogs_error=ConnectionError('dropped'))
+    assert asyncio.run(bot.find_toxibot()) is False
+    assert bot.toxibot_chat is None
+
+
+class _ResumableClient:
+    def __init__(self, *args):
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def is_user_authorized(self):
+        return True
+
+
+def test_failed_session_resume_leaves_nothing_half_started(monkeypatch):
+    clients = []
+
+    def make_client(*args):
+        clients.append(_ResumableClient(*args))
+        return clients[-1]
+
+    async def broken_start():
+        raise ConnectionError('dropped')
+
+    bot = main.LiveTradingBot()
+    bot.api_id, bot.api_hash = '12345', 'test-hash'
+    bot._start_trading = broken_start
+    monkeypatch.setattr(main, 'TELEGRAM_AVAILABLE', True)
+    monkeypatch.setattr(main, '_read_session', lambda: 'saved-session')
+    monkeypatch.setattr(main, '_load_telethon', lambda: (make_client, str))
+    monkeypatch.setattr(main.bot_state, 'authenticated', False)
+
+    assert asyncio.run(bot.try_resume_session()) is False
+    assert main.bot_state.authenticated is False
+    assert bot.client is None
+    assert clients[0].connected is False
+
+
+def test_load_without_saved_session_leaves_setup_to_dashboard(monkeypatch):
+    monkeypatch.setattr(main, 'TELEGRAM_AVAILABLE', True)
+    monkeypatch.setattr(main, '_read_session', lambda: None)
+    monkeypatch.setattr(main.bot_state, 'configured', False)
+    assert asyncio.run(main.load_existing_session()) is False
+    assert main.bot_state.configured is False
+
+
+def test_birdeye_null_page_does_not_drop_other_pages():
+    def page(url):
+        if 'sort_by=mc' in url:
+            return main.json_dumps({'success': True, 'data': {'tokens': [
+                {'address': 'Listed', 'symbol': 'LST', 'v24hUSD': 5000},
+            ]}})
+        return main.json_dumps({'success': True, 'data': {'tokens': None}})
+
+    discovery = main.TokenDiscovery()
+    session = _FakeSession(page)
+
+    async def get_session():
+        return session
+
+    discovery.get_session = get_session
+    tokens = asyncio.run(discovery.get_birdeye_tokens())
+    assert [token['address'] for token in tokens] == ['Listed']
+
+
+def test_holder_check_queries_solscan_directly(monkeypatch):
+    monkeypatch.setattr(main, 'HELIUS_API_KEY', 'test-key')
+    checker = main.ContractChecker()
+    session = _FakeSession(main.json_dumps({'data': [{'amount': 50}] * 12, 'total': 1000}))
+
+    async def get_session():
+        return session
+
+    checker.get_session = get_session
+    holders = asyncio.run(checker._check_holder_distribution('Mint1111111111111111111111111111111111111111'))
+    assert holders['holder_count'] == 12
+    assert holders['risk_score'] == 0
+    assert session.posts == 0
+
+
+def _not_indexed_checker():
+    checker = main.ContractChecker()
+    checker._rugcheck_not_found.add('Mint1111111111111111111111111111111111111111')
+    return checker
+
+
+def test_token_unknown_to_rugcheck_needs_a_secondary_answer():
+    result = _run_with(_not_indexed_checker(), TOO_NEW, None, None)
+    assert result.is_safe is False
+    assert result.risk_score == 8
+
+
+def test_token_unknown_to_rugcheck_is_cached_briefly(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(main.time, 'monotonic_ns', clock)
+    checker = _not_indexed_checker()
+    result = _run_with(checker, TOO_NEW, None, CLEAN_METADATA)
+    assert result.is_safe is True
+    mint = 'Mint1111111111111111111111111111111111111111'
+    clock.now = main.RUGCHECK_NOT_FOUND_TTL_NS - 1
+    assert mint in checker.checked_contracts
+    clock.now = main.RUGCHECK_NOT_FOUND_TTL_NS
+    assert mint not in checker.checked_contracts
+
+
+def test_rugcheck_report_is_cached_for_the_full_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(main.time, 'monotonic_ns', clock)
+    checker = main.ContractChecker()
+    report = {'risk_score': 2, 'rugcheck_score': 80, 'warnings': []}
+    _run_with(checker, report, None, None)
+    clock.now = main.CONTRACT_CACHE_TTL_NS - 1
+    assert 'Mint1111111111111111111111111111111111111111' in checker.checked_contracts
+
+
+def test_stats_stream_sends_change_made_during_a_write(monkeypatch):
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    server = main.WebServer()
+    server.app.on_startup.remove(server._start_stats_broadcast)
+    server._stats_body = b'{"profit":1}'
+    real_write = web.StreamResponse.write
+
+    async def write_then_change(response, data):
+        await real_write(response, data)
+        # The broadcaster ran and notified while this write was in progress
+        server._stats_body = b'{"profit":2}'
+
+    monkeypatch.setattr(web.StreamResponse, 'write', write_then_change)
+
+    async def scenario():
+        async with TestClient(TestServer(server.app)) as client:
+            response = await client.get('/api/stats/stream')
+            assert await response.content.readline() == b'data: {"profit":1}\n'
+            await response.content.readline()
+            assert await asyncio.wait_for(response.content.readline(), 2) == b'data: {"profit":2}\n'
+            await server._end_stats_streams(server.app)
+
+    asyncio.run(scenario())
+
+
+def test_accepts_gzip_honours_q_values():
+    assert main._accepts_gzip('gzip, deflate, br')
+    assert main._accepts_gzip('br;q=1.0, gzip;q=0.5')
+    assert main._accepts_gzip('*')
+    assert not main._accepts_gzip('gzip;q=0')
+    assert not main._accepts_gzip('gzip; q=0.000, *')
+    assert not main._accepts_gzip('*;q=0')
+    assert not main._accepts_gzip('x-gzipped, deflate')
+    assert not main._accepts_gzip('')
+
+
+def test_dashboard_skips_gzip_when_refused():
+    from aiohttp.test_utils import TestClient, TestServer
+
+    async def scenario():
+        async with TestClient(TestServer(main.WebServer().app)) as client:
+            refused = await client.get('/', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+            accepted = await client.get('/', headers={'Accept-Encoding': 'gzip'})
+            return refused.headers, accepted.headers
+
+    refused, accepted = asyncio.run(scenario())
+    assert 'Content-Encoding' not in refused
+    assert accepted['Content-Encoding'] == 'gzip'
+    assert refused['Vary'] == accepted['Vary'] == 'Accept-Encoding'
+
+
+def _trade(entry_price, current_price):
+    return main.Trade(
+        token_address='Mint1111111111111111111111111111111111111111', symbol='MINT',
+        entry_price=entry_price, current_price=current_price, position_size=2.0,
+        entry_time=0.0, personality=main.BotPersonality.SAFE_SCALPER,
+        stop_loss=entry_price * 0.93, take_profit=entry_price * 1.3,
+    )
+
+
+def test_trade_pnl_follows_current_price_assignment():
+    trade = _trade(1.0, 1.0)
+    assert trade.pnl == 0
+    trade.current_price = 1.5
+    assert trade.pnl == 1.0
+    assert trade.pnl_percent == 50.0
+    trade.update_price(0.5)
+    assert trade.pnl == -1.0
+
+
+def test_trade_without_entry_price_reports_no_pnl():
+    trade = _trade(0.0, 1.0)
+    assert trade.pnl == 0
+    assert trade.pnl_percent == 0